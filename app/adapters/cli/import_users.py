@@ -0,0 +1,34 @@
+"""
+Bulk user import from the command line.
+
+    python -m app.adapters.cli.import_users users.csv [--format csv]
+"""
+import argparse
+import asyncio
+
+from app.adapters.out.database.db import OutDatabase
+from app.adapters.out.database.repositories.user_repository import UserRepository
+from app.config.logging.logging_config import setup_logging
+from app.domain.services.user_import_service import UserImportService
+
+
+async def run(path: str, file_format: str | None) -> int:
+    async with OutDatabase.initialize():
+        report = await UserImportService(UserRepository()).import_file(path, file_format)
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-register users from an NDJSON, CSV or Parquet file")
+    parser.add_argument("path", help="Import file")
+    parser.add_argument("--format", dest="file_format", choices=["ndjson", "csv", "parquet"],
+                        help="File format, derived from the suffix when omitted")
+    args = parser.parse_args()
+
+    setup_logging()
+    raise SystemExit(asyncio.run(run(args.path, args.file_format)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, UploadFile
+
+from app.application.dependencies.auth_dependencies import require_staff
+from app.application.user_import_usecase import UserImportUseCase, get_user_import_use_case
+from app.adapters.out.files.user_file_reader import detect_format
+from app.domain.services.user_import_service import UserImportReport
+
+router = APIRouter(dependencies=[Depends(require_staff)])
+
+def _spool_to_disk(upload: UploadFile, suffix: str) -> str:
+    """ Copy the upload to a named temp file so every reader can seek it """
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as target:
+        shutil.copyfileobj(upload.file, target, length=1024 * 1024)
+        return target.name
+
+@router.post("/users/import", response_model=UserImportReport)
+async def import_users(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = None,
+    user_import_use_case: UserImportUseCase = Depends(get_user_import_use_case),
+):
+    """ Bulk-register users from an NDJSON, CSV or Parquet file """
+    file_format = detect_format(file.filename or "", file_format)
+    path = await asyncio.to_thread(_spool_to_disk, file, Path(file.filename or "").suffix)
+    try:
+        return await user_import_use_case.execute(path, file_format)
+    finally:
+        os.unlink(path)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Request, Response
+
+from app.config.config import app_config
+from app.domain.services.token_keys import TokenKeys
+
+router = APIRouter()
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    """ Public keys for verifying access tokens locally; served from memory, without touching the database """
+    body, etag = TokenKeys.get_instance().jwks()
+    headers = {"Cache-Control": f"public, max-age={app_config.JWKS_CACHE_SECONDS}", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
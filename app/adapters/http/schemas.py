@@ -0,0 +1,39 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.config.config import app_config
+
+
+class RegisterResponse(BaseModel):
+    """ Only the new account's id: the stored document holds the password hash and 2FA secrets """
+    message: str = "User registered successfully"
+    user_id: str
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+
+class IntrospectionRequest(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=app_config.INTROSPECTION_MAX_BATCH)
+
+
+class TokenIntrospection(BaseModel):
+    """ RFC 7662 fields for one token; an inactive token only has `active` """
+    active: bool
+    token_type: Optional[str] = None
+    sub: Optional[str] = None
+    username: Optional[str] = None
+    name: Optional[str] = None
+    is_staff: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+    aud: Optional[str] = None
+    exp: Optional[int] = None
+    jti: Optional[str] = None
+
+
+class IntrospectionResponse(BaseModel):
+    results: list[TokenIntrospection]  # Same order as the request's tokens
@@ -1,35 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 
+from app.adapters.http.schemas import (
+    IntrospectionRequest, IntrospectionResponse, RegisterResponse, TokenResponse,
+)
+from app.application.dependencies.admission_dependencies import admission
+from app.application.dependencies.auth_dependencies import get_current_user, oauth2_scheme, require_staff
+from app.application.token_introspection_usecase import (
+    TokenIntrospectionUseCase, get_token_introspection_use_case,
+)
 from app.application.user_loggedin_usecase import UserLoggedUseCase, get_loggedin_use_case
+from app.application.user_logout_usecase import UserLogoutUseCase, get_logout_use_case
 from app.application.user_register_usercase import UserRegisterUseCase, get_register_use_case
 from app.application.refresh_token_usecase import RefreshTokenUseCase, get_refresh_token_use_case
 from app.adapters.out.database.entities.user import UserCreate
+from app.config.config import app_config
 
 router = APIRouter()
 
-@router.post("/register")
+def _client_ip(request: Request):
+    return request.client.host if request.client else None  # Behind a proxy, run uvicorn with --proxy-headers
+
+@router.post("/register", response_model=RegisterResponse, dependencies=[admission("credentials")])
 async def register_user(
+    request: Request,
     user_data: UserCreate,
     register_use_case: UserRegisterUseCase = Depends(get_register_use_case),
 ):
     """ Register a new user """
-    return await register_use_case.execute(user_data)
+    user = await register_use_case.execute(user_data, _client_ip(request))
+    return RegisterResponse(user_id=str(user.id))
 
-@router.post("/token")
+@router.post("/token", response_model=TokenResponse, dependencies=[admission("credentials")])
 async def login_user(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     user_loggedin_use_case: UserLoggedUseCase = Depends(get_loggedin_use_case)
 ):
     """ Login user and return JWT """
-    access_token = await user_loggedin_use_case.execute(form_data.username, form_data.password)
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await user_loggedin_use_case.execute(form_data.username, form_data.password, _client_ip(request))
 
-@router.post("/refresh")
+@router.post("/refresh", response_model=TokenResponse, dependencies=[admission("default")])
 async def refresh_token(
+    request: Request,
     refresh_token: str,
     refresh_token_use_case: RefreshTokenUseCase = Depends(get_refresh_token_use_case),
 ):
-    """ Refresh access token using a valid refresh token """
-    new_access_token = await refresh_token_use_case.execute(refresh_token)
-    return {"access_token": new_access_token, "token_type": "bearer"}
\ No newline at end of file
+    """ Rotate a valid refresh token and return a new access token """
+    return await refresh_token_use_case.execute(refresh_token, _client_ip(request))
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(get_current_user), admission("default")],
+)
+async def logout_user(
+    token: str = Depends(oauth2_scheme),
+    user_logout_use_case: UserLogoutUseCase = Depends(get_logout_use_case),
+):
+    """ Revoke the presented access token and its refresh token session """
+    await user_logout_use_case.execute(token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post(
+    "/introspect",
+    response_model=IntrospectionResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_staff), admission("introspection")],
+)
+async def introspect_tokens(
+    body: IntrospectionRequest,
+    response: Response,
+    token_introspection_use_case: TokenIntrospectionUseCase = Depends(get_token_introspection_use_case),
+):
+    """ Status and claims of a batch of access tokens (RFC 7662 style), for gateways using a staff account """
+    results = await token_introspection_use_case.execute(body.tokens)
+    # Cacheable until the first of these tokens expires, and no longer than the server-side cache
+    now = time.time()
+    max_age = min([app_config.INTROSPECTION_CACHE_SECONDS] + [
+        result["exp"] - now for result in results if result.get("exp")
+    ])
+    response.headers["Cache-Control"] = f"private, max-age={max(0, int(max_age))}"
+    return {"results": results}
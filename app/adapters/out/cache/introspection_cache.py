@@ -0,0 +1,44 @@
+import hashlib
+import time
+from typing import Optional
+
+from app.adapters.out.cache.ttl_cache import TTLCache
+from app.config.config import app_config
+
+
+class IntrospectionCache:
+    """
+    Recent /auth/introspect results keyed by a digest of the token.
+
+    Entries live for INTROSPECTION_CACHE_SECONDS at most, and never past the token's
+    own `exp`, so a gateway re-checking the same token within that window costs a
+    dictionary lookup. Like the principal cache, a change to the user shows up once
+    the entry expires.
+    """
+    _instance = None  # Singleton instance
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size, ttl_seconds)
+
+    @classmethod
+    def get_instance(cls) -> "IntrospectionCache":
+        if cls._instance is None:
+            cls._instance = cls(app_config.INTROSPECTION_CACHE_SIZE, app_config.INTROSPECTION_CACHE_SECONDS)
+        return cls._instance
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=20).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        return self._cache.get(self._key(token))
+
+    def set(self, token: str, result: dict):
+        ttl_seconds = result["exp"] - time.time() if result.get("exp") else None
+        self._cache.set(self._key(token), result, ttl_seconds=ttl_seconds)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
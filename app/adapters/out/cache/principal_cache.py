@@ -0,0 +1,169 @@
+import asyncio
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.adapters.out.cache.ttl_cache import TTLCache
+from app.config.config import app_config
+
+logger = getLogger(__name__)
+
+
+class _LoadAbandoned(Exception):
+    """ The caller running a shared load was cancelled; waiters load again themselves """
+
+
+class PrincipalCache:
+    """
+    Per-process cache of authenticated users keyed by user id.
+
+    Concurrent misses for the same id share a single load (single-flight), so a
+    burst of requests for one user costs one database read. Entries are dropped
+    through `invalidate` whenever the repository writes to the user; other workers
+    only see the change once their entry's TTL runs out. When the caller running a
+    load is cancelled (its client went away), the callers waiting on it retry the
+    load rather than fail with it.
+    """
+    _instance = None  # Singleton instance
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size, ttl_seconds)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._stale: set[str] = set()  # In-flight loads invalidated by a concurrent write
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @classmethod
+    def get_instance(cls) -> "PrincipalCache":
+        if cls._instance is None:
+            cls._instance = cls(app_config.PRINCIPAL_CACHE_SIZE, app_config.PRINCIPAL_CACHE_TTL_SECONDS)
+        return cls._instance
+
+    async def get_or_load(self, user_id: str, loader: Callable[[str], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """ Return the cached principal or load it once for all concurrent callers """
+        while True:
+            principal = self._cache.get(user_id)
+            if principal is not None:
+                return principal
+
+            inflight = self._inflight.get(user_id)
+            if inflight is None:
+                return await self._load(user_id, loader)
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _LoadAbandoned:
+                continue
+
+    async def _load(self, user_id: str, loader: Callable[[str], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            principal = await loader(user_id)
+        except asyncio.CancelledError:
+            # Not `future.cancel()`: that would cancel every waiter along with this caller
+            future.set_exception(_LoadAbandoned())
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(user_id, None)
+            stale = user_id in self._stale
+            self._stale.discard(user_id)
+
+        # Only cache if no write happened while the load was in flight
+        if principal is not None and not stale:
+            self._cache.set(user_id, principal)
+        future.set_result(principal)
+        return principal
+
+    async def get_many_or_load(
+            self, user_ids: Iterable[str], loader: Callable[[list[str]], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """
+        Cached principals for `user_ids`, loading every miss with one `loader` call.
+
+        The batch load takes part in single-flight like `get_or_load`: ids already
+        being loaded are awaited rather than fetched again, and ids in this batch are
+        shared with concurrent single lookups. Unknown ids are absent from the result.
+        """
+        found: dict[str, Any] = {}
+        waiting: dict[str, asyncio.Future] = {}
+        missing: list[str] = []
+        for user_id in dict.fromkeys(user_ids):
+            principal = self._cache.get(user_id)
+            if principal is not None:
+                found[user_id] = principal
+            elif user_id in self._inflight:
+                waiting[user_id] = self._inflight[user_id]
+            else:
+                missing.append(user_id)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {user_id: loop.create_future() for user_id in missing}
+            self._inflight.update(futures)
+            try:
+                loaded = await loader(missing)
+            except asyncio.CancelledError:
+                for future in futures.values():
+                    future.set_exception(_LoadAbandoned())
+                    future.exception()  # Mark retrieved when nobody else is waiting
+                raise
+            except Exception as e:
+                for future in futures.values():
+                    future.set_exception(e)
+                    future.exception()  # Mark retrieved when nobody else is waiting
+                raise
+            finally:
+                stale = set()
+                for user_id in missing:
+                    self._inflight.pop(user_id, None)
+                    if user_id in self._stale:
+                        stale.add(user_id)
+                        self._stale.discard(user_id)
+
+            for user_id, future in futures.items():
+                principal = loaded.get(user_id)
+                if principal is not None:
+                    found[user_id] = principal
+                    if user_id not in stale:
+                        self._cache.set(user_id, principal)
+                future.set_result(principal)
+
+        if waiting:
+            self.coalesced += len(waiting)
+            results = await asyncio.gather(
+                *(asyncio.shield(future) for future in waiting.values()), return_exceptions=True
+            )
+            abandoned = []
+            for user_id, result in zip(waiting, results):
+                if isinstance(result, _LoadAbandoned):
+                    abandoned.append(user_id)
+                elif isinstance(result, BaseException):
+                    raise result
+                elif result is not None:
+                    found[user_id] = result
+            if abandoned:
+                found.update(await self.get_many_or_load(abandoned, loader))
+        return found
+
+    def invalidate(self, user_id: Any):
+        """ Drop a user from the cache after a write """
+        user_id = str(user_id)
+        self._cache.delete(user_id)
+        if user_id in self._inflight:
+            self._stale.add(user_id)
+        self.invalidations += 1
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+        }
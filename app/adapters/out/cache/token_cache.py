@@ -0,0 +1,44 @@
+import hashlib
+import time
+from typing import Optional
+
+from app.adapters.out.cache.ttl_cache import TTLCache
+from app.config.config import app_config
+
+
+class VerifiedTokenCache:
+    """
+    LRU of tokens that already passed signature and claim verification.
+
+    Keyed by a digest of the token so raw tokens are not kept in memory, and each
+    entry expires at the token's own `exp`. Failed verifications are never cached.
+    """
+    _instance = None  # Singleton instance
+
+    def __init__(self, max_size: int, max_ttl_seconds: float):
+        self._cache = TTLCache(max_size, max_ttl_seconds)
+
+    @classmethod
+    def get_instance(cls) -> "VerifiedTokenCache":
+        if cls._instance is None:
+            cls._instance = cls(app_config.TOKEN_CACHE_SIZE, app_config.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        return cls._instance
+
+    @staticmethod
+    def _key(purpose: str, token: str) -> tuple[str, bytes]:
+        return purpose, hashlib.blake2b(token.encode(), digest_size=20).digest()
+
+    def get(self, purpose: str, token: str) -> Optional[dict]:
+        payload = self._cache.get(self._key(purpose, token))
+        return dict(payload) if payload is not None else None  # Callers may mutate their copy
+
+    def set(self, purpose: str, token: str, payload: dict):
+        expires_in = payload.get("exp", 0) - time.time()
+        if expires_in > 0:
+            self._cache.set(self._key(purpose, token), dict(payload), ttl_seconds=expires_in)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
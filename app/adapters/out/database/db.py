@@ -1,15 +1,70 @@
+import asyncio
+import importlib.util
+import os
+import time
 from contextlib import asynccontextmanager
+from functools import cache
+from logging import getLogger
+from typing import Callable, Optional
 
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 
+from app.adapters.out.database.entities.login_throttle import LoginThrottleCounter
+from app.adapters.out.database.entities.refresh_token import RefreshToken
+from app.adapters.out.database.entities.revoked_token import RevokedToken, SequenceCounter
 from app.adapters.out.database.entities.user import User
+from app.adapters.out.database.indexes import IndexManager
+from app.adapters.out.database.pool_monitor import PoolTelemetry
 from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+from app.config.metrics.startup import startup_timer
+
+logger = getLogger(__name__)
+
+# Wire compressors and the module pymongo needs for each
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+_READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def available_compressors(setting: str) -> list[str]:
+    """ Compressors from MONGO_COMPRESSORS whose module is installed; unknown names are an error """
+    compressors = []
+    for name in (part.strip() for part in setting.split(",") if part.strip()):
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            raise GlobalException(f"Unknown Mongo compressor '{name}'", 500)
+        if importlib.util.find_spec(module) is None:
+            logger.warning("Mongo compressor %s skipped: the '%s' package is not installed", name, module)
+            continue
+        compressors.append(name)
+    return compressors
+
+
+@cache
+def lookup_read_preference() -> Primary | PrimaryPreferred | Secondary | SecondaryPreferred | Nearest:
+    """ Read preference for lookups that tolerate slightly stale data (MONGO_READ_PREFERENCE) """
+    name = app_config.MONGO_READ_PREFERENCE
+    if name == "primary":
+        return Primary()
+    mode = _READ_PREFERENCES.get(name)
+    if mode is None:
+        raise GlobalException(f"Unknown Mongo read preference '{name}'", 500)
+    return mode(max_staleness=app_config.MONGO_MAX_STALENESS_SECONDS)
 
 
 class OutDatabase:
     _instance = None  # Singleton instance
     _initialized = False  # Track if Beanie is initialized
+    _client_factory: Optional[Callable[[str], AsyncIOMotorClient]] = None  # Replaces AsyncIOMotorClient when set
+    _init_lock: Optional[asyncio.Lock] = None  # Serialises a lazy first initialisation
 
     def __init__(self, db_name: str, db_uri: str):
         """ Private constructor: Prevent direct instantiation """
@@ -18,14 +73,48 @@ class OutDatabase:
 
         self.db_name = db_name
         self.db_uri = db_uri
-        self.client = AsyncIOMotorClient(self.db_uri)
+        self.pid = os.getpid()  # Motor clients must not cross a fork
+        self.pool_telemetry = PoolTelemetry(app_config.MONGO_MAX_POOL_SIZE)
+        self.client = (OutDatabase._client_factory or AsyncIOMotorClient)(self.db_uri, **self._client_options())
         self.db = self.client[self.db_name]
+        self.index_report: dict | None = None
+
+    def _client_options(self) -> dict:
+        options = {
+            "maxPoolSize": app_config.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": app_config.MONGO_MIN_POOL_SIZE,
+            "maxConnecting": app_config.MONGO_MAX_CONNECTING,
+            "event_listeners": [self.pool_telemetry],
+        }
+        if app_config.MONGO_WAIT_QUEUE_TIMEOUT_MS:
+            options["waitQueueTimeoutMS"] = app_config.MONGO_WAIT_QUEUE_TIMEOUT_MS
+        compressors = available_compressors(app_config.MONGO_COMPRESSORS)
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        return options
+
+    @classmethod
+    def set_client_factory(cls, factory: Optional[Callable[[str], AsyncIOMotorClient]]):
+        """ Build the client with `factory`, e.g. an in-memory motor-compatible stand-in; call before first use """
+        cls._client_factory = factory
 
     @classmethod
     async def get_instance(cls):
         """ Ensure the singleton instance is created asynchronously. """
-        if cls._instance is None:
-            cls._instance = cls(app_config.DATABASE_NAME, app_config.MONGO_URI)
+        if cls._instance is not None and cls._instance.pid != os.getpid():
+            # Inherited from the parent process: its sockets and loop are not ours to use or close
+            logger.warning("Discarding a database client created before fork in process %d", cls._instance.pid)
+            cls._instance = None
+            cls._init_lock = None
+        if cls._instance is not None and cls._instance._initialized:
+            return cls._instance
+
+        # Concurrent first requests (lazy startup) must not see a half-initialised instance
+        if cls._init_lock is None:
+            cls._init_lock = asyncio.Lock()
+        async with cls._init_lock:
+            if cls._instance is None:
+                cls._instance = cls(app_config.DATABASE_NAME, app_config.MONGO_URI)
             await cls._instance._initialize_beanie()  # Async initialization
 
         return cls._instance
@@ -33,18 +122,70 @@ class OutDatabase:
     async def _initialize_beanie(self):
         """ Private method to initialize Beanie if not already initialized """
         if not self._initialized:
-            await init_beanie(
-                database=self.db,
-                document_models=[User]
-            )
+            with startup_timer.measure("beanie_init"):
+                await init_beanie(
+                    database=self.db,
+                    document_models=[User, RefreshToken, LoginThrottleCounter, RevokedToken, SequenceCounter],
+                    skip_indexes=True,  # Managed by IndexManager
+                )
+            with startup_timer.measure("indexes"):
+                self.index_report = await IndexManager(
+                    self.db, app_config.MONGO_INDEX_MODE, app_config.MONGO_INDEX_FAIL_ON_DRIFT
+                ).ensure()
+            with startup_timer.measure("mongo_warmup"):
+                await self.warm_up(app_config.MONGO_WARMUP_CONNECTIONS or app_config.MONGO_MIN_POOL_SIZE)
             self._initialized = True
 
+    async def warm_up(self, connections: int):
+        """ Open `connections` pooled connections with concurrent pings so early requests skip the handshake """
+        connections = max(1, min(connections, app_config.MONGO_MAX_POOL_SIZE))
+        start = time.perf_counter()
+        await asyncio.gather(*(self.db.command("ping") for _ in range(connections)))
+        logger.info("Mongo pool warmed up with %d concurrent pings in %.1fms",
+                    connections, (time.perf_counter() - start) * 1000)
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """ Pool usage of the current process' client, empty before startup """
+        return cls._instance.pool_telemetry.stats() if cls._instance is not None else {}
+
+    async def health(self) -> dict:
+        """ Round-trip time of a ping plus pool usage, for the deep health check """
+        start = time.perf_counter()
+        try:
+            await self.db.command("ping")
+            status = "ok"
+        except Exception as e:
+            logger.warning("Mongo ping failed: %s", e)
+            status = "unreachable"
+        return {
+            "status": status,
+            "ping_ms": round((time.perf_counter() - start) * 1000, 3),
+            "pool": self.pool_telemetry.stats(),
+        }
+
     @classmethod
     @asynccontextmanager
-    async def initialize(cls):
-        """ Context manager to get the database instance asynchronously """
-        instance = await cls.get_instance()
-        yield instance
+    async def initialize(cls, lazy: bool = False):
+        """
+        Context manager to get the database instance asynchronously, closed on exit.
+
+        With `lazy` nothing is connected up front (None is yielded); the first
+        get_instance() call does it, and whatever exists by then is closed on exit.
+        """
+        instance = None if lazy else await cls.get_instance()
+        try:
+            yield instance
+        finally:
+            if cls._instance is not None:
+                await cls._instance.close()
+
+    async def close(self):
+        """ Close the client's connection pools and forget the instance """
+        self.client.close()
+        if OutDatabase._instance is self:
+            OutDatabase._instance = None
+        logger.info("Database client closed")
 
 async def get_db():
     """ Dependency injection to provide a singleton database instance. """
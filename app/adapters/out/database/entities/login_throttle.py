@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+class LoginThrottleCounter(Document):
+    """ Failed login attempts of one throttle key in one fixed window """
+    id: str = Field(alias="_id")  # "<key>:<window number>"
+    failures: int = 0
+    last_failure: float = 0.0  # Epoch seconds
+    expires_at: datetime
+
+    class Settings:
+        name = "login_throttle"  # Indexes are declared in database/indexes.py
\ No newline at end of file
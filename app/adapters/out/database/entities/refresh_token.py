@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+class RefreshToken(Document):
+    """ Refresh token session, keyed by the token id (`tid` claim) and kept across rotations """
+    id: str = Field(alias="_id")
+    user_id: str
+    token_hash: str  # sha256 of the current token, the raw token is never stored
+    revoked: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    rotated_at: datetime | None = None
+    expires_at: datetime
+
+    class Settings:
+        name = "refresh_tokens"  # Indexes are declared in database/indexes.py
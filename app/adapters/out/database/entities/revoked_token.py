@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+class RevokedToken(Document):
+    """ A revoked access token, kept until the token would have expired anyway """
+    id: str = Field(alias="_id")  # The token's `jti`
+    seq: int  # Revocation sequence number, lets workers fetch only what is new
+    user_id: str
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime  # The token's `exp`
+
+    class Settings:
+        name = "revoked_tokens"  # Indexes are declared in database/indexes.py
+
+
+class SequenceCounter(Document):
+    """ Monotonic counter handing out sequence numbers, one document per sequence """
+    id: str = Field(alias="_id")
+    value: int = 0
+
+    class Settings:
+        name = "counters"
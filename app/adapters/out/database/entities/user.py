@@ -7,6 +7,7 @@ from fastapi_users_db_beanie import BeanieBaseUserDocument
 from pydantic import Field
 
 
+
 class UserCreate(BaseUserCreate):
     name: str
     two_factor_enabled: bool = False
@@ -22,6 +23,7 @@ class UserBase(BaseUser[PydanticObjectId]):
     name: str
     is_staff: bool = False
     is_locked: bool = False
+    locked_until: datetime | None = None  # Set by the login lockout; None keeps a lock until it is lifted
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     last_login: datetime | None = None
@@ -40,10 +42,16 @@ class User(BeanieBaseUserDocument, UserBase):
         name = "users"
 
     async def successful_login(self) -> None:
+        """ Written behind with other logins instead of saving the whole document """
+        from app.adapters.out.database.login_bookkeeping import LoginBookkeeping
+
         self.last_login = datetime.now()
-        await self.save()
+        await LoginBookkeeping.get_instance().record_success(self.id)
 
     async def failed_login(self) -> None:
+        """ Written behind with other logins instead of saving the whole document """
+        from app.adapters.out.database.login_bookkeeping import LoginBookkeeping
+
         self.last_failed_login = datetime.now()
         self.failed_log_attempts += 1
-        await self.save()
\ No newline at end of file
+        await LoginBookkeeping.get_instance().record_failure(self.id)
\ No newline at end of file
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
+
+
+class UserPrincipal(BaseModel):
+    """ Authenticated user as seen by protected routes """
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    name: str
+    is_active: bool = True
+    is_superuser: bool = False
+    is_staff: bool = False
+    is_locked: bool = False
+    locked_until: datetime | None = None
+
+    @property
+    def lock_active(self) -> bool:
+        """ Locked, and not by a lockout that has already expired """
+        return self.is_locked and (self.locked_until is None or self.locked_until > datetime.utcnow())
+
+
+class UserClaims(UserPrincipal):
+    """ Fields needed to build token claims """
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserCredentials(UserClaims):
+    """ Fields needed to verify a login and issue its tokens """
+    hashed_password: str
+    failed_log_attempts: int = 0
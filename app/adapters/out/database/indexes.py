@@ -0,0 +1,120 @@
+from logging import getLogger
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
+
+from app.adapters.out.database.entities.login_throttle import LoginThrottleCounter
+from app.adapters.out.database.entities.refresh_token import RefreshToken
+from app.adapters.out.database.entities.revoked_token import RevokedToken
+from app.adapters.out.database.entities.user import User
+from app.config.exception.global_exception import GlobalException
+
+logger = getLogger(__name__)
+
+# Options that make two indexes with the same name behave differently
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+# Every index the application relies on, per document model
+REQUIRED_INDEXES: dict[type[Document], list[IndexModel]] = {
+    User: [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        IndexModel(
+            [("email", ASCENDING)],
+            name="case_insensitive_email_index",
+            collation=Collation("en", strength=2),
+        ),
+    ],
+    RefreshToken: [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    LoginThrottleCounter: [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    RevokedToken: [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("seq", ASCENDING)], name="seq_1", unique=True),
+    ],
+}
+
+
+def _spec_drift(expected: dict, actual: dict) -> list[str]:
+    """ Differences between a declared index document and `index_information()` output """
+    differences = []
+    if list(expected["key"].items()) != [tuple(part) for part in actual["key"]]:
+        differences.append(f"key {list(expected['key'].items())} != {actual['key']}")
+    for option in _COMPARED_OPTIONS:
+        if expected.get(option) != actual.get(option):
+            differences.append(f"{option} {expected.get(option)!r} != {actual.get(option)!r}")
+    expected_collation = expected.get("collation")
+    if expected_collation:
+        actual_collation = actual.get("collation") or {}
+        if any(actual_collation.get(k) != v for k, v in expected_collation.items()):
+            differences.append(f"collation {expected_collation} != {actual_collation}")
+    return differences
+
+
+class IndexManager:
+    """
+    Creates or verifies REQUIRED_INDEXES at startup and reports drift.
+
+    mode 'create' builds missing indexes, 'verify' only compares, 'off' skips the check.
+    Indexes whose definition changed are never rebuilt automatically since that means
+    dropping them; they are reported, and abort startup when `fail_on_drift` is set.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, mode: str, fail_on_drift: bool,
+                 required: dict[type[Document], list[IndexModel]] = None):
+        if mode not in ("create", "verify", "off"):
+            raise GlobalException(f"Unknown index mode '{mode}'", 500)
+        self.db = db
+        self.mode = mode
+        self.fail_on_drift = fail_on_drift
+        self.required = REQUIRED_INDEXES if required is None else required
+
+    async def ensure(self) -> dict:
+        """ Bring the indexes in line with the declarations and return a drift report """
+        report = {"mode": self.mode, "created": [], "missing": [], "mismatched": [], "unexpected": []}
+        if self.mode == "off":
+            return report
+
+        for model, indexes in self.required.items():
+            collection = self.db[model.get_settings().name]
+            existing = await collection.index_information()
+            declared = {index.document["name"]: index for index in indexes}
+
+            to_create = []
+            for name, index in declared.items():
+                if name not in existing:
+                    to_create.append(index)
+                    continue
+                differences = _spec_drift(index.document, existing[name])
+                if differences:
+                    report["mismatched"].append({"collection": collection.name, "index": name, "drift": differences})
+
+            for name in existing.keys() - declared.keys() - {"_id_"}:
+                report["unexpected"].append({"collection": collection.name, "index": name})
+
+            if to_create and self.mode == "create":
+                await collection.create_indexes(to_create)
+                report["created"] += [f"{collection.name}.{index.document['name']}" for index in to_create]
+            else:
+                report["missing"] += [f"{collection.name}.{index.document['name']}" for index in to_create]
+
+        self._log(report)
+        if self.fail_on_drift and (report["missing"] or report["mismatched"]):
+            raise GlobalException("Database indexes do not match the application's requirements", 500, report)
+        return report
+
+    @staticmethod
+    def _log(report: dict):
+        if report["created"]:
+            logger.info("Created indexes: %s", ", ".join(report["created"]))
+        if report["missing"]:
+            logger.warning("Missing indexes: %s", ", ".join(report["missing"]))
+        for drift in report["mismatched"]:
+            logger.warning("Index %s.%s differs from its declaration: %s",
+                           drift["collection"], drift["index"], "; ".join(drift["drift"]))
+        for extra in report["unexpected"]:
+            logger.info("Undeclared index %s.%s", extra["collection"], extra["index"])
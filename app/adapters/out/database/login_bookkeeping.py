@@ -0,0 +1,208 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from logging import getLogger
+from typing import Optional
+
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+
+from app.adapters.out.database.entities.user import User
+from app.config.config import app_config
+from app.config.metrics.metrics import Counter, registry
+
+logger = getLogger(__name__)
+
+login_bookkeeping_flushed_total = registry.add(Counter(
+    "login_bookkeeping_flushed_total", "Coalesced login bookkeeping updates written, by outcome", ("result",)
+))
+
+# Server error codes worth retrying: failovers, shutdowns, network errors and time limits
+TRANSIENT_ERROR_CODES = frozenset({6, 7, 50, 89, 91, 189, 262, 9001, 10107, 11600, 11602, 13435, 13436})
+
+
+def is_transient(error: Exception) -> bool:
+    """ Whether a failed write may succeed when tried again """
+    if isinstance(error, (ConnectionFailure, ExecutionTimeout, WTimeoutError)):
+        return True
+    return isinstance(error, PyMongoError) and (
+        error.has_error_label("RetryableWriteError") or getattr(error, "code", None) in TRANSIENT_ERROR_CODES
+    )
+
+
+@dataclass
+class _PendingUpdate:
+    failures: int = 0
+    last_login: Optional[datetime] = None
+    last_failed_login: Optional[datetime] = None
+
+    def merge(self, other: "_PendingUpdate"):
+        self.failures += other.failures
+        self.last_login = max(filter(None, (self.last_login, other.last_login)), default=None)
+        self.last_failed_login = max(filter(None, (self.last_failed_login, other.last_failed_login)), default=None)
+
+    def operation(self, user_id: PydanticObjectId) -> UpdateOne:
+        """ Only commutative operators, so batches from several workers can land in any order """
+        update: dict = {}
+        if self.failures:
+            update["$inc"] = {"failed_log_attempts": self.failures}
+        latest = {"last_login": self.last_login, "last_failed_login": self.last_failed_login}
+        if any(latest.values()):
+            update["$max"] = {field: value for field, value in latest.items() if value is not None}
+        return UpdateOne({"_id": user_id}, update)
+
+
+class LoginBookkeeping:
+    """
+    Write-behind buffer for login bookkeeping: last_login, last_failed_login and the
+    failed attempt counter.
+
+    Updates are coalesced per user and written as unordered bulk_write batches of
+    `$inc`/`$max`, when LOGIN_BOOKKEEPING_MAX_PENDING users are waiting or every
+    LOGIN_BOOKKEEPING_FLUSH_SECONDS, and always on shutdown. Updates failing with a
+    transient error wait for the next flush, any other failure drops them. Writes that
+    decide access (locks, resetting the counter) do not go through here.
+    """
+    _instance = None  # Singleton instance
+
+    def __init__(self, flush_seconds: float, max_pending: int):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending: dict[PydanticObjectId, _PendingUpdate] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self.recorded = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    @classmethod
+    def get_instance(cls) -> "LoginBookkeeping":
+        if cls._instance is None:
+            cls._instance = cls(app_config.LOGIN_BOOKKEEPING_FLUSH_SECONDS, app_config.LOGIN_BOOKKEEPING_MAX_PENDING)
+        return cls._instance
+
+    @classmethod
+    @asynccontextmanager
+    async def initialize(cls):
+        """ Context manager running the periodic flush, with a final flush on exit """
+        instance = cls.get_instance()
+        task = asyncio.create_task(instance.run()) if instance.write_behind else None
+        try:
+            yield instance
+        finally:
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            await instance.flush()
+
+    @property
+    def write_behind(self) -> bool:
+        return self.flush_seconds > 0
+
+    async def record_success(self, user_id: PydanticObjectId):
+        await self._record(user_id, _PendingUpdate(last_login=datetime.now()))
+
+    async def record_failure(self, user_id: PydanticObjectId) -> int:
+        """ Count a failed login; returns this user's failures not yet written, this one included """
+        pending = await self._record(user_id, _PendingUpdate(failures=1, last_failed_login=datetime.now()))
+        return pending.failures if pending else 1
+
+    def discard_failures(self, user_id: PydanticObjectId):
+        """ Drop buffered failures made obsolete by a counter reset written directly """
+        pending = self._pending.get(user_id)
+        if pending is not None:
+            pending.failures = 0
+
+    async def _record(self, user_id: PydanticObjectId, update: _PendingUpdate) -> Optional[_PendingUpdate]:
+        """ Buffer an update and return what is still unwritten for the user, if anything """
+        self.recorded += 1
+        pending = self._pending.get(user_id)
+        if pending is None:
+            pending = self._pending[user_id] = update
+        else:
+            pending.merge(update)
+            self.coalesced += 1
+
+        if not self.write_behind:
+            await self.flush()
+            return self._pending.get(user_id)  # Only still there when the write failed
+        if len(self._pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+        return pending
+
+    async def run(self):
+        """ Flush every `flush_seconds`, or as soon as the buffer is full """
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """ Write everything buffered so far; updates that failed transiently wait for the next flush """
+        if not self._pending:
+            return
+        batch, self._pending = list(self._pending.items()), {}
+        for start in range(0, len(batch), self.max_pending):
+            chunk = batch[start:start + self.max_pending]
+            try:
+                await User.get_motor_collection().bulk_write(
+                    [update.operation(user_id) for user_id, update in chunk], ordered=False
+                )
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                self._failed(
+                    [chunk[error["index"]] for error in errors if error.get("code") in TRANSIENT_ERROR_CODES],
+                    [chunk[error["index"]] for error in errors if error.get("code") not in TRANSIENT_ERROR_CODES],
+                    len(chunk),
+                )
+            except Exception as e:
+                # A transient error leaves the outcome unknown: retrying may count a few failures twice,
+                # dropping would lose them all
+                retry = is_transient(e)
+                self._failed(chunk if retry else [], [] if retry else chunk, len(chunk))
+            else:
+                self._written(len(chunk))
+
+    def _written(self, count: int):
+        self.flushes += 1
+        self.written += count
+        login_bookkeeping_flushed_total.inc("written", amount=count)
+
+    def _failed(self, retry: list[tuple[PydanticObjectId, _PendingUpdate]],
+                dropped: list[tuple[PydanticObjectId, _PendingUpdate]], total: int):
+        """ Count a flush with failed users, keeping those that failed transiently for the next one """
+        self.failed_flushes += 1
+        self._written(total - len(retry) - len(dropped))
+        if retry:
+            login_bookkeeping_flushed_total.inc("retried", amount=len(retry))
+            logger.warning(
+                "Login bookkeeping flush failed for %d of %d users, retrying later", len(retry), total, exc_info=True
+            )
+        if dropped:
+            self.dropped += len(dropped)
+            login_bookkeeping_flushed_total.inc("dropped", amount=len(dropped))
+            logger.exception("Login bookkeeping flush failed for %d of %d users, dropping them", len(dropped), total)
+        for user_id, update in retry:
+            newer = self._pending.get(user_id)
+            if newer is not None:
+                update.merge(newer)
+            self._pending[user_id] = update
+
+    def stats(self) -> dict:
+        return {
+            "pending_users": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,108 @@
+import threading
+from collections import deque
+
+from pymongo import monitoring
+
+from app.config.metrics.metrics import Histogram, registry
+
+mongo_pool_checkout_duration = registry.add(Histogram(
+    "mongo_pool_checkout_seconds", "Time to check a connection out of the Mongo pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+))
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] if ordered else 0.0
+
+
+class PoolTelemetry(monitoring.ConnectionPoolListener):
+    """
+    Connection pool usage from pymongo's CMAP events.
+
+    Events arrive on the driver's threads, so counters are guarded by a lock. Recent
+    checkout latencies are kept for percentiles on the deep health check.
+    """
+    RECENT_CHECKOUTS = 1024
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque(maxlen=self.RECENT_CHECKOUTS)
+        self.open = 0  # Connections established
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waiting = 0  # Checkouts not yet served
+        self.peak_waiting = 0
+        self.checkouts = 0
+        self.checkout_failures: dict[str, int] = {}
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.checkouts += 1
+            if event.duration is not None:
+                self._recent.append(event.duration)
+        if event.duration is not None:
+            mongo_pool_checkout_duration.observe(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self) -> dict:
+        """ Pool usage snapshot, latencies in milliseconds """
+        with self._lock:
+            recent = sorted(self._recent)
+            return {
+                "max_pool_size": self.max_pool_size,
+                "open": self.open,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "waiting": self.waiting,
+                "peak_waiting": self.peak_waiting,
+                "saturation": round(self.in_use / self.max_pool_size, 3) if self.max_pool_size else 0.0,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "pool_clears": self.pool_clears,
+                "checkout_p50_ms": round(_percentile(recent, 50) * 1000, 3),
+                "checkout_p95_ms": round(_percentile(recent, 95) * 1000, 3),
+                "checkout_p99_ms": round(_percentile(recent, 99) * 1000, 3),
+                "checkout_max_ms": round(recent[-1] * 1000, 3) if recent else 0.0,
+            }
@@ -0,0 +1,254 @@
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta
+from hashlib import blake2b
+from logging import getLogger
+from typing import AsyncIterator, Iterable, Optional
+
+from bson import ObjectId
+
+from app.adapters.out.database.entities.user import User
+from app.config.config import app_config
+from app.config.metrics.metrics import Counter, registry
+from app.config.metrics.startup import startup_timer
+
+logger = getLogger(__name__)
+
+registered_email_lookups_total = registry.add(Counter(
+    "registered_email_lookups_total", "Registered email filter answers, by result", ("result",)
+))
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives.
+
+    Sized for `capacity` items at `fp_rate`, within `max_bytes`: a smaller cap keeps the
+    memory bound and raises the false positive rate instead.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float, max_bytes: int):
+        bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        self.size = max(64, min(bits, max_bytes * 8))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0  # Distinct items, as far as their bits tell
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        new = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def add_many(self, items: Iterable[str]):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    def false_positive_rate(self) -> float:
+        """ Expected rate at the current fill """
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class RegisteredEmailFilter:
+    """
+    In-memory Bloom filter of every registered email, so logins for unknown accounts
+    skip the database.
+
+    Built by streaming email projections in `_id` order, batch by batch; registrations
+    in this process are added as they happen, those from other workers by polling
+    for recent `_id`s every REGISTERED_EMAIL_SYNC_SECONDS. The filter is rebuilt from
+    scratch every REGISTERED_EMAIL_REBUILD_MINUTES, or sooner once it holds more than
+    it was sized for, to resize it and forget deleted accounts. Until it is built
+    every email counts as possibly registered.
+
+    A miss is answered from memory alone. The price is a lag window: for up to
+    REGISTERED_EMAIL_SYNC_SECONDS, an account registered on another worker is
+    unknown here and its logins get the same 401 as a wrong password.
+    """
+    _instance = None  # Singleton instance
+    MIN_CAPACITY = 10000
+    HEADROOM = 1.5  # Capacity per registered user when sizing a new filter
+    SYNC_OVERLAP = timedelta(minutes=5)  # `_id`s are stamped by the client: allow for skew and slow inserts
+
+    def __init__(self, enabled: bool, fp_rate: float, max_bytes: int, batch_size: int):
+        self.enabled = enabled
+        self.fp_rate = fp_rate
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self._filter: Optional[BloomFilter] = None
+        self._synced_from: Optional[datetime] = None  # Users inserted since then are fetched by the next sync
+        self._added_during_rebuild: Optional[list[str]] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.built_at: Optional[float] = None
+        self.lookups = 0
+        self.definite_misses = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        self.syncs = 0
+        self.failures = 0
+
+    @classmethod
+    def get_instance(cls) -> "RegisteredEmailFilter":
+        if cls._instance is None:
+            cls._instance = cls(
+                app_config.REGISTERED_EMAIL_FILTER_ENABLED,
+                app_config.REGISTERED_EMAIL_FILTER_FP_RATE,
+                app_config.REGISTERED_EMAIL_FILTER_MAX_MB * 1024 * 1024,
+                app_config.REGISTERED_EMAIL_FILTER_BATCH_SIZE,
+            )
+        return cls._instance
+
+    @property
+    def built(self) -> bool:
+        return self._filter is not None
+
+    def might_be_registered(self, email: str) -> bool:
+        """ False only for an email that was certainly not registered as of the last sync """
+        if self._filter is None:
+            return True
+        self.lookups += 1
+        if email in self._filter:
+            return True
+        self.definite_misses += 1
+        registered_email_lookups_total.inc("absent")
+        return False
+
+    def record_false_positive(self):
+        """ The filter said maybe, the database found nobody """
+        self.false_positives += 1
+        registered_email_lookups_total.inc("false_positive")
+
+    def add(self, emails: Iterable[str]):
+        """ Registered in this process: known here right away """
+        emails = list(emails)
+        if self._filter is not None:
+            self._filter.add_many(emails)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.extend(emails)
+
+    def start_rebuild(self):
+        """ Rebuild in the background unless a rebuild is running already """
+        if self.enabled and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._rebuild_task = asyncio.create_task(self._rebuild_logged())
+
+    async def _rebuild_logged(self):
+        try:
+            await self.rebuild()
+        except Exception:
+            self.failures += 1
+            logger.exception("Registered email filter rebuild failed")
+
+    async def rebuild(self):
+        """ Build a new filter from the users collection and swap it in """
+        started = datetime.utcnow()
+        start = time.perf_counter()
+        users = await User.get_motor_collection().estimated_document_count()
+        bloom = BloomFilter(max(self.MIN_CAPACITY, int(users * self.HEADROOM)), self.fp_rate, self.max_bytes)
+        self._added_during_rebuild = []
+        try:
+            async for emails in self._email_batches({}):
+                # A private filter until the swap, so it can be filled off the event loop
+                await asyncio.to_thread(bloom.add_many, emails)
+            async for emails in self._email_batches(self._inserted_since(started)):
+                bloom.add_many(emails)
+            bloom.add_many(self._added_during_rebuild)
+        finally:
+            self._added_during_rebuild = None
+        self._filter, self._synced_from = bloom, started
+        self.built_at = time.time()
+        self.rebuilds += 1
+        logger.info(
+            "Registered email filter built in %.2fs: %d emails, %.1f MiB, %d hashes, expected false positives %.4f%%",
+            time.perf_counter() - start, bloom.count, bloom.nbytes / 1024 / 1024, bloom.hashes,
+            bloom.false_positive_rate() * 100,
+        )
+
+    async def sync(self):
+        """ Add users inserted by other processes since the last sync """
+        started = datetime.utcnow()
+        async for emails in self._email_batches(self._inserted_since(self._synced_from)):
+            self._filter.add_many(emails)
+        self._synced_from = started
+        self.syncs += 1
+
+    async def run(self, sync_seconds: float, rebuild_seconds: float):
+        """ Background task keeping a built filter current; stops a build started by a login too """
+        try:
+            while True:
+                await asyncio.sleep(sync_seconds)
+                if self._filter is None:
+                    continue  # Lazy startup: the first login starts the build
+                try:
+                    if (time.time() - self.built_at >= rebuild_seconds
+                            or self._filter.count > self._filter.capacity):
+                        await self.rebuild()
+                    else:
+                        await self.sync()
+                except Exception:
+                    self.failures += 1
+                    logger.exception("Registered email filter refresh failed")
+        finally:
+            if self._rebuild_task is not None:
+                self._rebuild_task.cancel()
+
+    async def build_at_startup(self):
+        if not self.enabled:
+            return
+        with startup_timer.measure("registered_emails"):
+            await self._rebuild_logged()
+
+    def _inserted_since(self, since: datetime) -> dict:
+        return {"_id": {"$gte": ObjectId.from_datetime(since - self.SYNC_OVERLAP)}}
+
+    async def _email_batches(self, query: dict) -> AsyncIterator[list[str]]:
+        """ Emails matching `query` in `_id` order, paged by range rather than skip """
+        collection = User.get_motor_collection()
+        last_id = None
+        while True:
+            page = query if last_id is None else {**query, "_id": {**query.get("_id", {}), "$gt": last_id}}
+            documents = await collection.find(page, {"email": 1}).sort("_id", 1).limit(self.batch_size).to_list(None)
+            if not documents:
+                return
+            yield [document["email"] for document in documents if document.get("email")]
+            if len(documents) < self.batch_size:
+                return
+            last_id = documents[-1]["_id"]
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        return {
+            "enabled": self.enabled,
+            "built": bloom is not None,
+            "emails": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            "bytes": bloom.nbytes if bloom else 0,
+            "hashes": bloom.hashes if bloom else 0,
+            "target_fp_rate": self.fp_rate,
+            "expected_fp_rate": round(bloom.false_positive_rate(), 6) if bloom else None,
+            "lookups": self.lookups,
+            "definite_misses": self.definite_misses,
+            "false_positives": self.false_positives,
+            "rebuilds": self.rebuilds,
+            "syncs": self.syncs,
+            "failures": self.failures,
+        }
@@ -0,0 +1,133 @@
+import hashlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+from app.adapters.out.database.entities.refresh_token import RefreshToken
+from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+
+
+def hash_token(token: str) -> str:
+    """ Refresh tokens are high-entropy, so an unsalted digest is enough to avoid storing them raw """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenStore(ABC):
+    """ Storage backend for refresh token sessions """
+
+    @abstractmethod
+    async def save(self, token_id: str, user_id: str, token: str, expires_at: datetime) -> None:
+        """ Store a newly issued refresh token """
+
+    @abstractmethod
+    async def rotate(self, token_id: str, user_id: str, old_token: str, new_token: str,
+                     expires_at: datetime) -> bool:
+        """ Swap `old_token` for `new_token`; False when the old one is unknown, revoked, expired or already rotated """
+
+    @abstractmethod
+    async def revoke(self, token_id: str) -> None:
+        """ Revoke a refresh token session """
+
+
+class MongoRefreshTokenStore(RefreshTokenStore):
+    """ Refresh tokens in their own collection, every call is a single atomic round trip """
+
+    @staticmethod
+    def _collection():
+        return RefreshToken.get_motor_collection()
+
+    async def save(self, token_id: str, user_id: str, token: str, expires_at: datetime) -> None:
+        await self._collection().update_one(
+            {"_id": token_id},
+            {"$set": {
+                "user_id": user_id,
+                "token_hash": hash_token(token),
+                "revoked": False,
+                "created_at": datetime.utcnow(),
+                "expires_at": expires_at,
+            }},
+            upsert=True,
+        )
+
+    async def rotate(self, token_id: str, user_id: str, old_token: str, new_token: str,
+                     expires_at: datetime) -> bool:
+        now = datetime.utcnow()
+        rotated = await self._collection().find_one_and_update(
+            {
+                "_id": token_id,
+                "user_id": user_id,
+                "token_hash": hash_token(old_token),
+                "revoked": False,
+                "expires_at": {"$gt": now},
+            },
+            {"$set": {"token_hash": hash_token(new_token), "rotated_at": now, "expires_at": expires_at}},
+            projection={"_id": 1},
+        )
+        return rotated is not None
+
+    async def revoke(self, token_id: str) -> None:
+        await self._collection().update_one({"_id": token_id}, {"$set": {"revoked": True}})
+
+
+class InMemoryRefreshTokenStore(RefreshTokenStore):
+    """ Process-local store for tests and single-process development """
+
+    def __init__(self):
+        self._tokens: dict[str, dict] = {}
+
+    def _prune(self, now: datetime):
+        for token_id in [key for key, record in self._tokens.items() if record["expires_at"] <= now]:
+            del self._tokens[token_id]
+
+    async def save(self, token_id: str, user_id: str, token: str, expires_at: datetime) -> None:
+        self._prune(datetime.utcnow())
+        self._tokens[token_id] = {
+            "user_id": user_id,
+            "token_hash": hash_token(token),
+            "revoked": False,
+            "expires_at": expires_at,
+        }
+
+    async def rotate(self, token_id: str, user_id: str, old_token: str, new_token: str,
+                     expires_at: datetime) -> bool:
+        record = self._tokens.get(token_id)
+        if (
+            record is None
+            or record["revoked"]
+            or record["user_id"] != user_id
+            or record["token_hash"] != hash_token(old_token)
+            or record["expires_at"] <= datetime.utcnow()
+        ):
+            return False
+        record["token_hash"] = hash_token(new_token)
+        record["expires_at"] = expires_at
+        return True
+
+    async def revoke(self, token_id: str) -> None:
+        if token_id in self._tokens:
+            self._tokens[token_id]["revoked"] = True
+
+
+_stores = {
+    "mongo": MongoRefreshTokenStore,
+    "memory": InMemoryRefreshTokenStore,
+}
+_store: Optional[RefreshTokenStore] = None
+
+
+def get_refresh_token_store() -> RefreshTokenStore:
+    """ Return the configured refresh token store (REFRESH_TOKEN_STORE) """
+    global _store
+    if _store is None:
+        store_cls = _stores.get(app_config.REFRESH_TOKEN_STORE)
+        if store_cls is None:
+            raise GlobalException(f"Unknown refresh token store '{app_config.REFRESH_TOKEN_STORE}'", 500)
+        _store = store_cls()
+    return _store
+
+
+def set_refresh_token_store(store: RefreshTokenStore) -> None:
+    """ Swap the store, e.g. for an in-memory one in tests """
+    global _store
+    _store = store
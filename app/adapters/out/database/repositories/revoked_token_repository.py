@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from pymongo import ASCENDING, ReturnDocument
+
+from app.adapters.out.database.entities.revoked_token import RevokedToken, SequenceCounter
+from app.config.metrics.metrics import timed_stage
+
+_PROJECTION = {"seq": 1, "revoked_at": 1, "expires_at": 1}
+
+
+class RevokedTokenRepository:
+    """ Revoked access tokens, numbered by a shared sequence so workers can fetch only new entries """
+    SEQUENCE = "revoked_tokens"
+
+    async def revoke(self, jti: str, user_id: str, expires_at: datetime) -> int:
+        """ Persist a revocation under the next sequence number and return that number """
+        with timed_stage("mongo"):
+            counter = await SequenceCounter.get_motor_collection().find_one_and_update(
+                {"_id": self.SEQUENCE}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+            await RevokedToken.get_motor_collection().update_one(
+                {"_id": jti},
+                {"$setOnInsert": {
+                    "seq": counter["value"],
+                    "user_id": user_id,
+                    "revoked_at": datetime.utcnow(),
+                    "expires_at": expires_at,
+                }},
+                upsert=True,
+            )
+        return counter["value"]
+
+    async def find_since(self, seq: int, limit: int) -> list[dict]:
+        """ Revocations numbered above `seq`, in sequence order """
+        return await RevokedToken.get_motor_collection().find(
+            {"seq": {"$gt": seq}}, _PROJECTION
+        ).sort("seq", ASCENDING).limit(limit).to_list(length=None)
+
+    async def find_active(self) -> list[dict]:
+        """ Every revocation whose token has not expired yet """
+        return await RevokedToken.get_motor_collection().find(
+            {"expires_at": {"$gt": datetime.utcnow()}}, _PROJECTION
+        ).to_list(length=None)
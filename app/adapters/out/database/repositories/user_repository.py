@@ -1,45 +1,188 @@
-from app.adapters.out.database.db import OutDatabase
+from app.adapters.out.cache.principal_cache import PrincipalCache
+from app.adapters.out.database.db import OutDatabase, lookup_read_preference
+from app.adapters.out.database.login_bookkeeping import LoginBookkeeping
+from app.adapters.out.database.registered_email_filter import RegisteredEmailFilter
+from app.adapters.out.database.repositories.refresh_token_store import get_refresh_token_store
 from app.adapters.out.database.entities.user import User
-from passlib.context import CryptContext
-from typing import Optional
+from app.adapters.out.database.entities.user_projections import UserClaims, UserCredentials, UserPrincipal
+from app.adapters.out.security.password_executor import PasswordExecutor
+from app.adapters.out.security.password_hashing import get_hash_policy
+from app.config.metrics.metrics import timed_stage
+from beanie import PydanticObjectId
+from beanie.odm.utils.projection import get_projection
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+from datetime import datetime
+from typing import Optional, Type, TypeVar
 
-class UserRepository:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+Projection = TypeVar("Projection", UserPrincipal, UserClaims, UserCredentials)
 
+class UserRepository:
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """ Fetch a user by email """
-        return await User.find_one(User.email == email)
+        with timed_stage("mongo"):
+            return await User.find_one(User.email == email)
 
     async def create_user(self, user_data: dict) -> User:
         """ Hash password and create a new user """
-        hashed_password = self.pwd_context.hash(user_data["password"])
+        with timed_stage("password_hash"):
+            hashed_password = await PasswordExecutor.get_instance().hash(user_data["password"])
         user = User(**user_data, hashed_password=hashed_password)
-        await user.insert()
+        with timed_stage("mongo"):
+            await user.insert()
+        RegisteredEmailFilter.get_instance().add([user.email])
         return user
 
+    async def insert_users(self, users: list[User]) -> dict[int, str]:
+        """ Insert a batch unordered, returning {batch position: error} for rows that failed """
+        errors = {}
+        try:
+            with timed_stage("mongo"):
+                await User.insert_many(users, ordered=False)
+        except BulkWriteError as e:
+            errors = {
+                error["index"]: "Email already registered" if error["code"] == 11000 else error["errmsg"]
+                for error in e.details.get("writeErrors", [])
+            }
+        RegisteredEmailFilter.get_instance().add(
+            user.email for position, user in enumerate(users) if position not in errors
+        )
+        return errors
+
     async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """ Verify hashed password """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        with timed_stage("password_hash"):
+            return await PasswordExecutor.get_instance().verify(plain_password, hashed_password)
+
+    def password_needs_rehash(self, hashed_password: str) -> bool:
+        """ Whether a hash uses an older algorithm or a lower cost than the current policy """
+        return get_hash_policy().needs_rehash(hashed_password)
+
+    async def upgrade_password_hash(self, user_id: PydanticObjectId, plain_password: str, old_hash: str) -> bool:
+        """ Rehash with the current policy, replacing the stored hash only if it is still `old_hash` """
+        new_hash = await PasswordExecutor.get_instance().hash(plain_password)
+        result = await User.get_motor_collection().update_one(
+            {"_id": user_id, "hashed_password": old_hash}, {"$set": {"hashed_password": new_hash}}
+        )
+        return result.modified_count == 1
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """ Fetch a user by ID """
-        return await User.get(user_id)
-
-    async def save_refresh_token(self, user_id: str, refresh_token: str):
-        """ Save refresh token for a user """
-        user = await User.get(user_id)
-        if user:
-            user.refresh_token = refresh_token
-            await user.save()
-
-    async def get_refresh_token(self, user_id: str) -> Optional[str]:
-        """ Retrieve stored refresh token """
-        user = await User.get(user_id)
-        return user.refresh_token if user else None
-
-    async def revoke_refresh_token(self, user_id: str):
-        """ Revoke a user's refresh token """
-        user = await User.get(user_id)
-        if user:
-            user.refresh_token = None
-            await user.save()
\ No newline at end of file
+        with timed_stage("mongo"):
+            return await User.get(user_id)
+
+    async def get_credentials_by_email(self, email: str) -> Optional[UserCredentials]:
+        """
+        Fetch only what a login needs: password hash, status flags and token claims.
+
+        Emails the registered email filter has never seen are answered without a query.
+        """
+        registered_emails = RegisteredEmailFilter.get_instance()
+        filtered = registered_emails.built
+        if not filtered:
+            registered_emails.start_rebuild()  # Lazy startup, or the startup build failed
+        elif not registered_emails.might_be_registered(email):
+            return None
+        with timed_stage("mongo"):
+            credentials = await User.find_one(User.email == email, projection_model=UserCredentials)
+        if credentials is None and filtered:
+            registered_emails.record_false_positive()
+        return credentials
+
+    async def spend_verify_time(self):
+        """ As long as `verify_password` takes, for logins to accounts that do not exist """
+        with timed_stage("password_hash"):
+            await PasswordExecutor.get_instance().spend_verify_time()
+
+    async def get_claims_by_id(self, user_id: str) -> Optional[UserClaims]:
+        """ Fetch only the fields used as token claims """
+        return await self._find_projection_by_id(user_id, UserClaims)
+
+    async def get_principal_by_id(self, user_id: str) -> Optional[UserPrincipal]:
+        """ Fetch only the fields describing an authenticated user """
+        return await self._find_projection_by_id(user_id, UserPrincipal)
+
+    async def get_principals_by_ids(self, user_ids: list[str]) -> dict[str, UserPrincipal]:
+        """ Fetch several principals with one `$in` query, keyed by id; unknown or malformed ids are left out """
+        object_ids = []
+        for user_id in user_ids:
+            try:
+                object_ids.append(PydanticObjectId(user_id))
+            except (InvalidId, TypeError):
+                continue
+        if not object_ids:
+            return {}
+        with timed_stage("mongo"):
+            documents = await self._lookup_collection().find(
+                {"_id": {"$in": object_ids}}, get_projection(UserPrincipal)
+            ).to_list(length=None)
+        return {str(document["_id"]): UserPrincipal.model_validate(document) for document in documents}
+
+    async def _find_projection_by_id(self, user_id: str, projection: Type[Projection]) -> Optional[Projection]:
+        try:
+            object_id = PydanticObjectId(user_id)
+        except (InvalidId, TypeError):
+            return None
+        with timed_stage("mongo"):
+            document = await self._lookup_collection().find_one({"_id": object_id}, get_projection(projection))
+        return projection.model_validate(document) if document else None
+
+    @staticmethod
+    def _lookup_collection():
+        """ Users collection for read-only lookups, which may be served by secondaries (MONGO_READ_PREFERENCE) """
+        settings = User.get_settings()
+        return settings.motor_db.get_collection(settings.name, read_preference=lookup_read_preference())
+
+    async def save_refresh_token(self, token_id: str, user_id: str, refresh_token: str, expires_at: datetime):
+        """ Store a newly issued refresh token """
+        with timed_stage("token_store"):
+            await get_refresh_token_store().save(token_id, user_id, refresh_token, expires_at)
+
+    async def rotate_refresh_token(
+            self, token_id: str, user_id: str, refresh_token: str, new_refresh_token: str, expires_at: datetime
+    ) -> bool:
+        """ Atomically replace a refresh token with its successor """
+        with timed_stage("token_store"):
+            return await get_refresh_token_store().rotate(
+                token_id, user_id, refresh_token, new_refresh_token, expires_at
+            )
+
+    async def revoke_refresh_token(self, token_id: str):
+        """ Revoke a refresh token session """
+        with timed_stage("token_store"):
+            await get_refresh_token_store().revoke(token_id)
+
+    async def record_failed_login(self, user_id: PydanticObjectId, stored_failures: int) -> int:
+        """
+        Count a failed login (written behind) and return the consecutive failures as far as
+        this process knows: `stored_failures`, read with the credentials, plus its unwritten ones
+        """
+        return stored_failures + await LoginBookkeeping.get_instance().record_failure(user_id)
+
+    async def record_successful_login(self, user_id: PydanticObjectId, clear_failures: bool):
+        """ Stamp the login (written behind), and reset failures and an expired lockout right away """
+        if clear_failures:
+            LoginBookkeeping.get_instance().discard_failures(user_id)
+            with timed_stage("mongo"):
+                await User.get_motor_collection().update_one(
+                    {"_id": user_id}, {"$set": {"failed_log_attempts": 0, "is_locked": False, "locked_until": None}}
+                )
+            PrincipalCache.get_instance().invalidate(user_id)
+        await LoginBookkeeping.get_instance().record_success(user_id)
+
+    async def lock_until(self, user_id: PydanticObjectId, until: datetime):
+        """
+        Lock an account until `until` (UTC), starting the failure count over: once the lock
+        expires, it takes another LOGIN_LOCKOUT_THRESHOLD failures to lock it again
+        """
+        LoginBookkeeping.get_instance().discard_failures(user_id)
+        with timed_stage("mongo"):
+            await User.get_motor_collection().update_one(
+                {"_id": user_id}, {"$set": {"is_locked": True, "locked_until": until, "failed_log_attempts": 0}}
+            )
+        PrincipalCache.get_instance().invalidate(user_id)
+
+async def get_user_repository() -> UserRepository:
+    """ Dependency providing a repository once the database is ready (connected on first use with lazy startup) """
+    await OutDatabase.get_instance()
+    return UserRepository()
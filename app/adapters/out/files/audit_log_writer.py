@@ -0,0 +1,84 @@
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+from app.config.exception.global_exception import GlobalException
+
+logger = getLogger(__name__)
+
+AUDIT_COLUMNS = ("ts", "event", "user_id", "email", "client_ip", "detail")
+COMPRESSIONS = ("UNCOMPRESSED", "SNAPPY", "GZIP", "ZSTD", "LZ4", "BROTLI")
+
+
+@dataclass
+class _Part:
+    path: Path
+    opened: float  # time.monotonic()
+    row_groups: int = 0
+
+
+class ParquetAuditWriter:
+    """
+    Appends audit events to Parquet files partitioned by UTC day:
+    `<directory>/date=YYYY-MM-DD/events-<start>-<pid>-<part>.parquet`.
+
+    Each batch becomes one row group of the current file. Every append rewrites the
+    footer, which lists all row groups, so a new part is started once the file reaches
+    `max_file_bytes`, `max_row_groups` or `max_age_seconds`, whichever comes first. The
+    process id in the name keeps workers out of each other's files. Blocking: call it
+    from a thread.
+    """
+
+    def __init__(self, directory: str, max_file_bytes: int, compression: str,
+                 max_row_groups: int, max_age_seconds: float):
+        compression = compression.upper()
+        if compression not in COMPRESSIONS:
+            raise GlobalException(f"Unknown audit log compression '{compression}'", 500)
+        self.directory = Path(directory)
+        self.max_file_bytes = max_file_bytes
+        self.max_row_groups = max_row_groups
+        self.max_age_seconds = max_age_seconds
+        self.compression = compression
+        self._prefix = f"events-{datetime.utcnow():%Y%m%dT%H%M%S}-{os.getpid()}"
+        self._parts_by_day: dict[str, _Part] = {}  # Current part by day
+        self._parts = 0
+        self.files_written = 0
+        self.rows_written = 0
+
+    def write(self, events: list[tuple]):
+        """ Append a batch of `AUDIT_COLUMNS` tuples, split by day """
+        import pandas as pd
+        from fastparquet import write
+
+        frame = pd.DataFrame.from_records(events, columns=AUDIT_COLUMNS)
+        frame["ts"] = pd.to_datetime(frame["ts"], utc=True)
+        for day, rows in frame.groupby(frame["ts"].dt.strftime("%Y-%m-%d"), sort=True):
+            part = self._current_part(day)
+            write(
+                str(part.path), rows, compression=self.compression, object_encoding="utf8",
+                write_index=False, append=part.path.exists(),
+            )
+            part.row_groups += 1
+            self.rows_written += len(rows)
+
+    def _current_part(self, day: str) -> _Part:
+        """ Part to append to for `day`, rotated by size, row groups and age """
+        part: Optional[_Part] = self._parts_by_day.get(day)
+        if part is None or self._full(part):
+            self._parts += 1
+            path = self.directory / f"date={day}" / f"{self._prefix}-{self._parts:04d}.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            part = _Part(path, time.monotonic())
+            self._parts_by_day = {day: part}  # Earlier days are complete
+            self.files_written += 1
+            logger.debug("Audit log now writing %s", path)
+        return part
+
+    def _full(self, part: _Part) -> bool:
+        return (part.row_groups >= self.max_row_groups
+                or time.monotonic() - part.opened >= self.max_age_seconds
+                or (part.path.exists() and part.path.stat().st_size >= self.max_file_bytes))
@@ -0,0 +1,75 @@
+import json
+import math
+from pathlib import Path
+from typing import Iterator
+
+from app.config.exception.global_exception import GlobalException
+
+FORMATS_BY_SUFFIX = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+
+
+class RowError(dict):
+    """ Placeholder for a row that could not be decoded, carrying the error message """
+
+
+def detect_format(path: str, file_format: str | None = None) -> str:
+    """ Use the explicit format or derive it from the file suffix """
+    file_format = file_format or FORMATS_BY_SUFFIX.get(Path(path).suffix.lower())
+    if file_format not in ("ndjson", "csv", "parquet"):
+        raise GlobalException(f"Unsupported import format for '{Path(path).name}'", 400)
+    return file_format
+
+
+def _clean(record: dict) -> dict:
+    """ Drop empty cells so model defaults apply """
+    return {
+        key: value for key, value in record.items()
+        if value is not None and value != "" and not (isinstance(value, float) and math.isnan(value))
+    }
+
+
+def _iter_ndjson(path: str, chunk_size: int) -> Iterator[list[dict]]:
+    chunk = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                chunk.append(_clean(record) if isinstance(record, dict) else RowError(error="Row is not an object"))
+            except json.JSONDecodeError as e:
+                chunk.append(RowError(error=f"Invalid JSON: {e.msg}"))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_csv(path: str, chunk_size: int) -> Iterator[list[dict]]:
+    import pandas as pd
+
+    # Everything as text so pydantic does the type coercion, as for JSON input
+    for frame in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        yield [_clean(record) for record in frame.to_dict("records")]
+
+
+def _iter_parquet(path: str, chunk_size: int) -> Iterator[list[dict]]:
+    from fastparquet import ParquetFile
+
+    # Memory is bounded by the largest row group
+    for frame in ParquetFile(path).iter_row_groups():
+        for start in range(0, len(frame), chunk_size):
+            yield [_clean(record) for record in frame.iloc[start:start + chunk_size].to_dict("records")]
+
+
+def iter_user_rows(path: str, file_format: str, chunk_size: int) -> Iterator[list[dict]]:
+    """ Stream an import file as chunks of raw row dicts (RowError for undecodable rows) """
+    readers = {"ndjson": _iter_ndjson, "csv": _iter_csv, "parquet": _iter_parquet}
+    return readers[file_format](path, chunk_size)
@@ -0,0 +1,197 @@
+import asyncio
+import math
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import Optional
+
+from app.adapters.out.security.password_hashing import (
+    calibrate, get_hash_policy, hash_password, hash_passwords, set_hash_policy, verify_password,
+)
+from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+from app.config.metrics.startup import startup_timer
+from app.config.server.runtime import cpus_per_worker
+
+logger = getLogger(__name__)
+
+_DUMMY_PASSWORD = "not-a-registered-account"
+
+
+class PoolSaturated(Exception):
+    """ The hashing pool is full; answered with a 503 carrying Retry-After """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing pool saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordExecutor:
+    """
+    Bounded worker pool for password hashing.
+
+    Hashing and verification are CPU-bound and would otherwise block the event loop
+    for the whole hash cost. Work is pushed to a thread or process pool; once
+    `max_workers + max_queue` operations are pending, new ones are rejected with
+    `PoolSaturated` (a 503 carrying Retry-After) instead of queueing forever.
+    """
+    _instance = None  # Singleton instance
+    VERIFY_SMOOTHING = 0.1  # Weight of the newest sample in the average verification time
+
+    def __init__(self, pool_type: str, max_workers: int, max_queue: int):
+        if pool_type not in ("thread", "process"):
+            raise GlobalException(f"Unknown password hash pool type '{pool_type}'", 500)
+
+        self.pool_type = pool_type
+        self.max_workers = max_workers or cpus_per_worker()
+        self.max_queue = max_queue
+        self._pool: Executor | None = None
+
+        self.pending = 0  # Operations running or waiting for a worker
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.verify_seconds: Optional[float] = None  # Moving average, queueing included
+        self._dummy_hash: Optional[str] = None
+
+    @classmethod
+    def get_instance(cls) -> "PasswordExecutor":
+        """ Return the shared executor, creating it from config on first use """
+        if cls._instance is None:
+            cls._instance = cls(
+                app_config.PASSWORD_HASH_POOL,
+                app_config.PASSWORD_HASH_WORKERS,
+                app_config.PASSWORD_HASH_QUEUE_SIZE,
+            )
+        return cls._instance
+
+    @classmethod
+    @asynccontextmanager
+    async def initialize(cls, lazy: bool = False):
+        """
+        Context manager starting the pool on enter (or on first use when `lazy`) and draining it on exit.
+
+        With PASSWORD_HASH_TARGET_MS set, the hash cost is calibrated first; when `lazy`,
+        in the background while requests are served with the configured cost.
+        """
+        instance = cls.get_instance()
+        calibration = None
+        if app_config.PASSWORD_HASH_TARGET_MS > 0:
+            if lazy:
+                calibration = asyncio.create_task(instance.calibrate(app_config.PASSWORD_HASH_TARGET_MS))
+            else:
+                await instance.calibrate(app_config.PASSWORD_HASH_TARGET_MS)
+        elif not lazy:
+            instance.start()
+        try:
+            yield instance
+        finally:
+            if calibration is not None:
+                calibration.cancel()
+                await asyncio.gather(calibration, return_exceptions=True)
+            await asyncio.to_thread(instance.shutdown)
+
+    def start(self):
+        if self._pool is not None:
+            return
+        with startup_timer.measure("hashing_pool"):
+            if self.pool_type == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pwd-hash")
+        logger.info("Password hashing %s pool started with %d workers", self.pool_type, self.max_workers)
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True)
+        self._pool = None
+        logger.info("Password hashing pool stopped")
+
+    async def run(self, fn, *args):
+        """ Run `fn(*args)` on the pool, rejecting the call when the queue is full """
+        if self.pending >= self.max_workers + self.max_queue:
+            self._reject()
+
+        self.start()
+        self.pending += 1
+        self.submitted += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def _reject(self):
+        self.rejected += 1
+        # Verifications are timed queueing included, so a full pool's average is about the wait ahead
+        raise PoolSaturated(max(1, math.ceil(self.verify_seconds or 0)))
+
+    async def calibrate(self, target_ms: float):
+        """ Tune the cost of new hashes to `target_ms` per hash, measured on this pool's workers """
+        with startup_timer.measure("hash_calibration"):
+            policy, estimated_ms = await self.run(calibrate, get_hash_policy(), target_ms)
+        set_hash_policy(policy)
+        logger.info("Password hashing calibrated to %s (~%.0fms per hash, target %.0fms)",
+                    policy.describe(), estimated_ms, target_ms)
+        if estimated_ms > target_ms * 2:
+            logger.warning("The lowest %s cost is well over PASSWORD_HASH_TARGET_MS on this machine", policy.algorithm)
+        if policy.algorithm == "bcrypt" and policy.bcrypt_rounds < 10:
+            logger.warning("Calibrated bcrypt cost %d is below the recommended minimum of 10", policy.bcrypt_rounds)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password, get_hash_policy())
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """ Hash a batch spread across all workers """
+        if not passwords:
+            return []
+        size = math.ceil(len(passwords) / self.max_workers)
+        slices = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+        policy = get_hash_policy()
+        hashed = await asyncio.gather(*(self.run(hash_passwords, part, policy) for part in slices))
+        return [value for part in hashed for value in part]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        start = time.perf_counter()
+        verified = await self.run(verify_password, plain_password, hashed_password, get_hash_policy())
+        elapsed = time.perf_counter() - start
+        if self.verify_seconds is None:
+            self.verify_seconds = elapsed
+        else:
+            self.verify_seconds += self.VERIFY_SMOOTHING * (elapsed - self.verify_seconds)
+        return verified
+
+    async def spend_verify_time(self):
+        """
+        Take as long as a verification does, for an account that does not exist.
+
+        Sleeps for the average verification time rather than hashing, so unknown emails
+        cost no worker; until a verification has been timed, one runs against a dummy hash.
+        """
+        if self.verify_seconds is not None:
+            await asyncio.sleep(self.verify_seconds)
+            return
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(_DUMMY_PASSWORD)
+        await self.verify(_DUMMY_PASSWORD + "!", self._dummy_hash)
+
+    def stats(self) -> dict:
+        """ Pool saturation snapshot """
+        return {
+            "pool": self.pool_type,
+            "policy": get_hash_policy().describe(),
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.max_workers),
+            "queued": max(0, self.pending - self.max_workers),
+            "peak_pending": self.peak_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "verify_ms": round(self.verify_seconds * 1000, 3) if self.verify_seconds is not None else None,
+            "saturation": round(self.pending / (self.max_workers + self.max_queue), 3),
+        }
@@ -0,0 +1,145 @@
+import math
+import re
+import time
+from dataclasses import dataclass, replace
+from functools import cache
+from logging import getLogger
+from typing import Optional
+
+from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+
+logger = getLogger(__name__)
+
+ALGORITHMS = ("bcrypt", "argon2")
+_BCRYPT_COST = re.compile(r"^\$2[abxy]\$(\d{2})\$")
+_ARGON2_COST = re.compile(r"^\$argon2id\$v=\d+\$m=(\d+),t=(\d+),p=(\d+)\$")
+_CALIBRATION_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    """ Algorithm and cost for new password hashes; sent along with every task to the hashing pool """
+    algorithm: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
+
+    @classmethod
+    def from_config(cls) -> "HashPolicy":
+        if app_config.PASSWORD_HASH_ALGORITHM not in ALGORITHMS:
+            raise GlobalException(f"Unknown password hash algorithm '{app_config.PASSWORD_HASH_ALGORITHM}'", 500)
+        return cls(
+            algorithm=app_config.PASSWORD_HASH_ALGORITHM,
+            bcrypt_rounds=app_config.BCRYPT_ROUNDS,
+            argon2_time_cost=app_config.ARGON2_TIME_COST,
+            argon2_memory_cost=app_config.ARGON2_MEMORY_COST,
+            argon2_parallelism=app_config.ARGON2_PARALLELISM,
+        )
+
+    def describe(self) -> str:
+        if self.algorithm == "argon2":
+            return (f"argon2id t={self.argon2_time_cost} m={self.argon2_memory_cost}KiB "
+                    f"p={self.argon2_parallelism}")
+        return f"bcrypt rounds={self.bcrypt_rounds}"
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Whether a stored hash is weaker than this policy: another algorithm or a lower cost.
+
+        Only upgrades count, so processes calibrated to slightly different costs do not
+        keep rewriting each other's hashes.
+        """
+        if self.algorithm == "bcrypt":
+            match = _BCRYPT_COST.match(hashed_password)
+            return match is None or int(match.group(1)) < self.bcrypt_rounds
+        match = _ARGON2_COST.match(hashed_password)
+        return (match is None or int(match.group(1)) < self.argon2_memory_cost
+                or int(match.group(2)) < self.argon2_time_cost)
+
+
+_policy: Optional[HashPolicy] = None
+
+
+def get_hash_policy() -> HashPolicy:
+    """ Policy for new hashes: from config, or as calibrated at startup """
+    global _policy
+    if _policy is None:
+        _policy = HashPolicy.from_config()
+    return _policy
+
+
+def set_hash_policy(policy: HashPolicy):
+    global _policy
+    _policy = policy
+
+
+@cache
+def password_hash(policy: HashPolicy):
+    """ pwdlib hasher for `policy`, built once per process; hashes of the other algorithm still verify """
+    from pwdlib import PasswordHash
+    from pwdlib.hashers.argon2 import Argon2Hasher
+    from pwdlib.hashers.bcrypt import BcryptHasher
+
+    bcrypt = BcryptHasher(rounds=policy.bcrypt_rounds)
+    argon2 = Argon2Hasher(
+        time_cost=policy.argon2_time_cost,
+        memory_cost=policy.argon2_memory_cost,
+        parallelism=policy.argon2_parallelism,
+    )
+    return PasswordHash((argon2, bcrypt) if policy.algorithm == "argon2" else (bcrypt, argon2))
+
+
+def hash_password(password: str, policy: HashPolicy) -> str:
+    """ Hash a password (runs inside the worker pool) """
+    return password_hash(policy).hash(password)
+
+
+def hash_passwords(passwords: list[str], policy: HashPolicy) -> list[str]:
+    """ Hash a batch of passwords in one task to amortise pool dispatch """
+    hasher = password_hash(policy)
+    return [hasher.hash(password) for password in passwords]
+
+
+def verify_password(plain_password: str, hashed_password: str, policy: HashPolicy) -> bool:
+    """ Verify a password against its hash (runs inside the worker pool) """
+    from pwdlib.exceptions import UnknownHashError
+
+    try:
+        return password_hash(policy).verify(plain_password, hashed_password)
+    except UnknownHashError:
+        logger.warning("Stored password hash has an unknown format")
+        return False
+
+
+def _seconds_per_hash(policy: HashPolicy, samples: int = 3) -> float:
+    """ Median time of a few hashes, without keeping the trial hasher cached """
+    hasher = password_hash.__wrapped__(policy)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(_CALIBRATION_PASSWORD)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[samples // 2]
+
+
+def calibrate(policy: HashPolicy, target_ms: float) -> tuple[HashPolicy, float]:
+    """
+    Cost giving the closest to `target_ms` per hash on this machine (runs inside the worker pool).
+
+    Returns the tuned policy and its estimated milliseconds per hash. Only the cost
+    moves: the algorithm, Argon2 memory and parallelism stay as configured.
+    """
+    target = target_ms / 1000
+    if policy.algorithm == "bcrypt":
+        # Every extra round doubles the work: time a cheap cost and extrapolate
+        base = 8
+        seconds = _seconds_per_hash(replace(policy, bcrypt_rounds=base))
+        rounds = min(31, max(4, base + round(math.log2(target / seconds))))
+        return replace(policy, bcrypt_rounds=rounds), seconds * 2 ** (rounds - base) * 1000
+
+    # At a fixed memory cost the time grows linearly with the number of passes
+    seconds = _seconds_per_hash(replace(policy, argon2_time_cost=1))
+    time_cost = max(1, round(target / seconds))
+    return replace(policy, argon2_time_cost=time_cost), seconds * time_cost * 1000
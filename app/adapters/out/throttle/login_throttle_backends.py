@@ -0,0 +1,171 @@
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from app.adapters.out.database.entities.login_throttle import LoginThrottleCounter
+from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+
+
+class ThrottleState(NamedTuple):
+    current: int  # Failures in the current fixed window
+    previous: int  # Failures in the window before it
+    elapsed: float  # Share of the current window already gone
+    last_failure: Optional[float]  # Epoch seconds
+
+    @property
+    def failures(self) -> float:
+        """ Sliding-window estimate: the previous window weighted by how much of it still overlaps """
+        return self.current + self.previous * (1 - self.elapsed)
+
+    def seconds_until_below(self, limit: float, window_seconds: float) -> float:
+        """ Time until the estimate drops under `limit` if no further failures happen """
+        if self.failures < limit:
+            return 0.0
+        if self.current < limit:
+            # The previous window's weight has to shrink to what the current one leaves
+            return (1 - (limit - self.current) / self.previous - self.elapsed) * window_seconds
+        # The current window has to become the previous one and decay
+        return (1 - self.elapsed + 1 - limit / self.current) * window_seconds
+
+
+def _position(window_seconds: float) -> tuple[int, float]:
+    """ Current fixed window number and the share of it already elapsed """
+    now = time.time() / window_seconds
+    return int(now), now % 1
+
+
+class ThrottleBackend(ABC):
+    """ Failure counters for login throttling, approximating a sliding window with two fixed windows """
+
+    @abstractmethod
+    async def get(self, key: str, window_seconds: float) -> ThrottleState:
+        """ Current failure count of `key` """
+
+    @abstractmethod
+    async def add_failure(self, key: str, window_seconds: float) -> ThrottleState:
+        """ Record a failure and return the updated state """
+
+    @abstractmethod
+    async def reset(self, key: str, window_seconds: float) -> None:
+        """ Forget the failures of `key` """
+
+
+class ShardedMemoryThrottleBackend(ThrottleBackend):
+    """
+    Per-process counters split over shards.
+
+    Expired entries are pruned one shard at a time, so cleanup cost stays small and
+    spread out however many keys are tracked.
+    """
+    PRUNE_EVERY = 1024  # Writes between two shard prunes
+
+    def __init__(self, shards: int = 16):
+        # key -> [window number, current count, previous count, last failure]
+        self._shards: list[dict[str, list]] = [{} for _ in range(shards)]
+        self._writes = 0
+        self._next_prune = 0
+
+    def _shard(self, key: str) -> dict[str, list]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    async def get(self, key: str, window_seconds: float) -> ThrottleState:
+        window, elapsed = _position(window_seconds)
+        entry = self._shard(key).get(key)
+        if entry is None:
+            return ThrottleState(0, 0, elapsed, None)
+        if entry[0] == window:
+            return ThrottleState(entry[1], entry[2], elapsed, entry[3])
+        if entry[0] == window - 1:
+            return ThrottleState(0, entry[1], elapsed, entry[3])
+        return ThrottleState(0, 0, elapsed, entry[3])
+
+    async def add_failure(self, key: str, window_seconds: float) -> ThrottleState:
+        window, elapsed = _position(window_seconds)
+        shard = self._shard(key)
+        entry = shard.get(key)
+        if entry is None or entry[0] < window - 1:
+            entry = shard[key] = [window, 0, 0, None]
+        elif entry[0] == window - 1:
+            entry[:3] = [window, 0, entry[1]]
+        entry[1] += 1
+        entry[3] = time.time()
+
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune(self._shards[self._next_prune], window)
+            self._next_prune = (self._next_prune + 1) % len(self._shards)
+        return ThrottleState(entry[1], entry[2], elapsed, entry[3])
+
+    async def reset(self, key: str, window_seconds: float) -> None:
+        self._shard(key).pop(key, None)
+
+    @staticmethod
+    def _prune(shard: dict[str, list], window: int):
+        for key in [key for key, entry in shard.items() if entry[0] < window - 1]:
+            del shard[key]
+
+
+class MongoThrottleBackend(ThrottleBackend):
+    """ Counters shared by all workers, one document per key and fixed window, expired by TTL """
+
+    @staticmethod
+    def _ids(key: str, window: int) -> tuple[str, str]:
+        return f"{key}:{window}", f"{key}:{window - 1}"
+
+    async def get(self, key: str, window_seconds: float) -> ThrottleState:
+        window, elapsed = _position(window_seconds)
+        current_id, previous_id = self._ids(key, window)
+        counts = {current_id: 0, previous_id: 0}
+        last_failure = None
+        async for counter in LoginThrottleCounter.get_motor_collection().find(
+                {"_id": {"$in": [current_id, previous_id]}}
+        ):
+            counts[counter["_id"]] = counter["failures"]
+            last_failure = max(last_failure or 0, counter["last_failure"])
+        return ThrottleState(counts[current_id], counts[previous_id], elapsed, last_failure)
+
+    async def add_failure(self, key: str, window_seconds: float) -> ThrottleState:
+        window, _ = _position(window_seconds)
+        current_id, _ = self._ids(key, window)
+        await LoginThrottleCounter.get_motor_collection().update_one(
+            {"_id": current_id},
+            {
+                "$inc": {"failures": 1},
+                "$max": {"last_failure": time.time()},
+                # Kept while it can still be the previous window
+                "$setOnInsert": {"expires_at": datetime.utcfromtimestamp((window + 2) * window_seconds)},
+            },
+            upsert=True,
+        )
+        return await self.get(key, window_seconds)
+
+    async def reset(self, key: str, window_seconds: float) -> None:
+        await LoginThrottleCounter.get_motor_collection().delete_many(
+            {"_id": {"$in": list(self._ids(key, _position(window_seconds)[0]))}}
+        )
+
+
+_backends = {
+    "memory": ShardedMemoryThrottleBackend,
+    "mongo": MongoThrottleBackend,
+}
+_backend: Optional[ThrottleBackend] = None
+
+
+def get_throttle_backend() -> ThrottleBackend:
+    """ Return the configured throttle backend (LOGIN_THROTTLE_BACKEND) """
+    global _backend
+    if _backend is None:
+        backend_cls = _backends.get(app_config.LOGIN_THROTTLE_BACKEND)
+        if backend_cls is None:
+            raise GlobalException(f"Unknown login throttle backend '{app_config.LOGIN_THROTTLE_BACKEND}'", 500)
+        _backend = backend_cls()
+    return _backend
+
+
+def set_throttle_backend(backend: ThrottleBackend) -> None:
+    """ Swap the backend, e.g. for a shared one provided by the deployment """
+    global _backend
+    _backend = backend
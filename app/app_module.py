@@ -1,18 +1,102 @@
+import asyncio
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
+from app.adapters.out.cache.introspection_cache import IntrospectionCache
+from app.adapters.out.cache.principal_cache import PrincipalCache
+from app.adapters.out.cache.token_cache import VerifiedTokenCache
 from app.adapters.out.database.db import OutDatabase  # Singleton DB instance
+from app.adapters.out.database.login_bookkeeping import LoginBookkeeping
+from app.adapters.out.database.registered_email_filter import RegisteredEmailFilter
+from app.adapters.out.security.password_executor import PasswordExecutor
+from app.application.dependencies.admission_dependencies import AdmissionController, admission
 from app.application.middleware.app_middleware import app_middleware
+from app.config.config import app_config
+from app.config.metrics.metrics import registry as metrics_registry
+from app.config.metrics.startup import startup_timer
 from app.config.logging.logging_config import setup_logging
 from app.config.exception.exception_handler import register_exception_handler
 from app.adapters.http.user_route import router as auth_router
+from app.adapters.http.admin_route import router as admin_router
+from app.adapters.http.jwks_route import router as jwks_router
+from app.domain.services.audit_log import AuditLog
+from app.domain.services.auth_service import run_signing_key_rotation
+from app.domain.services.token_keys import ASYMMETRIC_ALGORITHMS, TokenKeys
+from app.domain.services.token_revocation import TokenRevocationList
+
+def component_metrics():
+    """ Expose the pool and cache counters as gauges on /metrics """
+    components = {
+        "password_hash": PasswordExecutor.get_instance().stats(),
+        "principal_cache": PrincipalCache.get_instance().stats(),
+        "token_cache": VerifiedTokenCache.get_instance().stats(),
+        "introspection_cache": IntrospectionCache.get_instance().stats(),
+        "token_revocations": TokenRevocationList.get_instance().stats(),
+        "login_bookkeeping": LoginBookkeeping.get_instance().stats(),
+        "audit_log": AuditLog.get_instance().stats(),
+        "registered_emails": RegisteredEmailFilter.get_instance().stats(),
+        "mongo_pool": OutDatabase.pool_stats(),
+    }
+    for component, stats in components.items():
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield f"{component}_{key}", "gauge", f"{component} {key}", [({}, value)]
+
+    budgets = AdmissionController.get_instance().stats()
+    for key in ("in_flight", "queued", "service_time_ms"):
+        samples = [({"budget": name}, stats[key]) for name, stats in budgets.items()]
+        if samples:
+            yield f"admission_{key}", "gauge", f"admission {key} by budget", samples
+
+    phases = [({"phase": phase}, seconds) for phase, seconds in startup_timer.phases.items()]
+    if startup_timer.first_response_seconds is not None:
+        phases.append(({"phase": "first_response"}, startup_timer.first_response_seconds))
+    if phases:
+        yield "app_startup_phase_seconds", "gauge", "Seconds spent in each startup phase", phases
+
+metrics_registry.register_collector(component_metrics)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """ Handle startup & shutdown for DB connection """
-    async with OutDatabase.initialize():
+    """
+    Handle startup & shutdown for DB connection, password hashing pool and background jobs.
+
+    In lazy startup mode the database and hashing pool are only created by the first
+    request that needs them, so the process starts accepting connections sooner.
+    """
+    lazy = app_config.STARTUP_MODE == "lazy"
+    async with (
+        OutDatabase.initialize(lazy), PasswordExecutor.initialize(lazy),
+        LoginBookkeeping.initialize(), AuditLog.initialize(),
+    ):
+        with startup_timer.measure("signing_keys"):
+            TokenKeys.get_instance()  # Fail at startup on bad key configuration
+        revocations = TokenRevocationList.get_instance()
+        registered_emails = RegisteredEmailFilter.get_instance()
+        if not lazy:
+            with startup_timer.measure("token_revocations"):
+                await revocations.ensure_loaded()
+            await registered_emails.build_at_startup()
+        background_tasks = [
+            asyncio.create_task(revocations.run_sync(app_config.REVOCATION_SYNC_SECONDS)),
+            asyncio.create_task(registered_emails.run(
+                app_config.REGISTERED_EMAIL_SYNC_SECONDS, app_config.REGISTERED_EMAIL_REBUILD_MINUTES * 60
+            )),
+        ]
+        if app_config.JWT_KEY_ROTATION_HOURS > 0 and app_config.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            background_tasks.append(
+                asyncio.create_task(run_signing_key_rotation(app_config.JWT_KEY_ROTATION_HOURS * 3600))
+            )
+
+        startup_timer.mark_ready()
         yield  # Application runs here
-        OutDatabase.get_instance().close() # Gracefully close DB
+
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+    # Leaving the block writes queued audit events, flushes buffered login bookkeeping, drains the hashing pool, then closes the database client
 
 def app_module(application: FastAPI):
     """ Register all application components """
@@ -23,9 +107,32 @@ def app_module(application: FastAPI):
     # Attach lifespan function to FastAPI
     application.router.lifespan_context = lifespan
 
-    @application.get("/healthcheck")
-    async def heartbeat():
-        """ Health check endpoint """
-        return {"status": 200, "message": "I am alive."}
+    @application.get("/healthcheck", dependencies=[admission("default")])
+    async def heartbeat(deep: bool = False):
+        """ Health check endpoint; `deep=true` also pings Mongo and reports pool usage """
+        health = {
+            "status": 200,
+            "message": "I am alive.",
+            "password_hashing": PasswordExecutor.get_instance().stats(),
+            "principal_cache": PrincipalCache.get_instance().stats(),
+            "token_cache": VerifiedTokenCache.get_instance().stats(),
+            "introspection_cache": IntrospectionCache.get_instance().stats(),
+            "token_revocations": TokenRevocationList.get_instance().stats(),
+            "login_bookkeeping": LoginBookkeeping.get_instance().stats(),
+            "audit_log": AuditLog.get_instance().stats(),
+            "registered_emails": RegisteredEmailFilter.get_instance().stats(),
+            "admission": AdmissionController.get_instance().stats(),
+            "startup": startup_timer.report(),
+        }
+        if deep:
+            health["mongo"] = await (await OutDatabase.get_instance()).health()
+        return health
+
+    @application.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics():
+        """ Prometheus metrics """
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
-    application.include_router(auth_router, prefix="/auth", tags=["Authentication"])
\ No newline at end of file
+    application.include_router(auth_router, prefix="/auth", tags=["Authentication"])
+    application.include_router(admin_router, prefix="/admin", tags=["Administration"])
+    application.include_router(jwks_router, tags=["Authentication"])
\ No newline at end of file
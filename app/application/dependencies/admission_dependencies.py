@@ -0,0 +1,127 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from logging import getLogger
+
+from fastapi import Depends, HTTPException, status
+
+from app.config.config import AdmissionBudget, app_config
+from app.config.metrics.metrics import Counter, registry
+
+logger = getLogger(__name__)
+
+admission_rejected_total = registry.add(Counter(
+    "admission_rejected_total", "Requests shed by admission control", ("budget", "reason")
+))
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded, time-limited wait queue.
+
+    The service time of admitted requests is tracked as a moving average. A request
+    that would have to wait longer than the queue timeout is refused at once instead
+    of timing out in the queue, and Retry-After is derived from the same estimate.
+    """
+    SMOOTHING = 0.2  # Weight of the latest service time in the average
+
+    def __init__(self, name: str, budget: AdmissionBudget):
+        self.name = name
+        self.budget = budget
+        self._slots = asyncio.Semaphore(budget.max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.service_time = 0.0  # Seconds, moving average
+
+    def _estimated_wait(self) -> float:
+        """ Expected time for everyone already queued, plus this request, to get a slot """
+        return self.service_time * (self.queued + 1) / self.budget.max_concurrency
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        admission_rejected_total.inc(self.name, reason)
+        logger.warning("Shedding request on budget '%s' (%s)", self.name, reason)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": str(max(1, math.ceil(self._estimated_wait())))},
+        )
+
+    @asynccontextmanager
+    async def admit(self):
+        """ Hold a slot for the duration of the block, or raise a 503 """
+        if self._slots.locked():
+            if self.queued >= self.budget.max_queue:
+                self._reject("queue_full")
+            if self._estimated_wait() > self.budget.queue_timeout_seconds:
+                self._reject("overloaded")
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.budget.queue_timeout_seconds)
+            except asyncio.TimeoutError:
+                self._reject("queue_timeout")
+            finally:
+                self.queued -= 1
+        else:
+            await self._slots.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            self.service_time += self.SMOOTHING * (time.perf_counter() - start - self.service_time)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.budget.max_concurrency,
+            "max_queue": self.budget.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "service_time_ms": round(self.service_time * 1000, 2),
+        }
+
+
+class AdmissionController:
+    """ One limiter per budget in ADMISSION_BUDGETS; unknown names get the default budget """
+    _instance = None  # Singleton instance
+
+    def __init__(self, budgets: dict[str, AdmissionBudget]):
+        self.budgets = budgets
+        self._limiters: dict[str, AdmissionLimiter] = {}
+
+    @classmethod
+    def get_instance(cls) -> "AdmissionController":
+        if cls._instance is None:
+            cls._instance = cls(app_config.ADMISSION_BUDGETS)
+        return cls._instance
+
+    def limiter(self, name: str) -> AdmissionLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            budget = self.budgets.get(name) or self.budgets.get("default") or AdmissionBudget()
+            limiter = self._limiters[name] = AdmissionLimiter(name, budget)
+        return limiter
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+
+def admission(budget: str):
+    """ Route dependency running the request under the named concurrency budget """
+    async def admit():
+        if not app_config.ADMISSION_CONTROL_ENABLED:
+            yield
+            return
+        async with AdmissionController.get_instance().limiter(budget).admit():
+            yield
+
+    return Depends(admit)
@@ -1,6 +1,8 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from app.adapters.out.cache.principal_cache import PrincipalCache
 from app.domain.services.auth_service import AuthService, get_auth_service
+from app.domain.services.token_revocation import TokenRevocationList
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
@@ -8,21 +10,45 @@ async def get_current_user(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    """ Extract user from JWT token and return User object """
+    """ Extract user from JWT token and return the authenticated principal """
     payload = auth_service.decode_jwt(token)
-    if not payload:
+    if not payload or not payload.get("sub"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
 
-    email = payload.get("email")
-    user = await auth_service.user_repo.get_user_by_email(email)
+    # In-memory revocation mirror: no database call per request
+    revocations = TokenRevocationList.get_instance()
+    await revocations.ensure_loaded()
+    if revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
+    user = await PrincipalCache.get_instance().get_or_load(
+        payload["sub"], auth_service.user_repo.get_principal_by_id
+    )
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    if not user.is_active or user.lock_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user",
+        )
+
+    return user
 
-    return user
\ No newline at end of file
+async def require_staff(user=Depends(get_current_user)):
+    """ Restrict a route to staff and superusers """
+    if not (user.is_staff or user.is_superuser):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return user
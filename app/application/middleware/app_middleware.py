@@ -1,19 +1,77 @@
+import random
+import time
 from logging import getLogger
 
-from fastapi import FastAPI, Request
-import time
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import app_config
+from app.config.metrics.metrics import (
+    http_request_duration, http_requests_in_flight, http_requests_total, request_timings,
+)
+from app.config.metrics.startup import startup_timer
+
 logger = getLogger(__name__)
 
 
-def app_middleware(application: FastAPI):
-    @application.middleware("http")
-    async def middleware(request: Request, call_next):
-        logger.info(f"Incoming request: {request.method} {request.url}")
-        start_time = time.time()
+class RequestMiddleware:
+    """
+    Pure ASGI middleware for request metrics, Server-Timing and access logs.
+
+    Avoids the BaseHTTPMiddleware machinery used by `@app.middleware("http")`.
+    Routes are labelled by their path template so metric cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.sample_rates = app_config.LOG_SAMPLE_RATES
 
-        response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        process_time = time.time() - start_time
-        logger.info(f"Request processed in {process_time:.2f}s with status code {response.status_code}")
+        start_time = time.perf_counter()
+        timings: dict[str, float] = {}
+        context_token = request_timings.set(timings)
+        status_code = 500
 
-        return response
\ No newline at end of file
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total = time.perf_counter() - start_time
+                entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+                entries.append(f"app;dur={total * 1000:.1f}")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", ", ".join(entries).encode())]
+            await send(message)
+            if message["type"] == "http.response.start":
+                startup_timer.mark_first_response()
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            http_requests_in_flight.dec()
+            request_timings.reset(context_token)
+            self._record(scope, status_code, time.perf_counter() - start_time)
+
+    def _record(self, scope: Scope, status_code: int, duration: float):
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        http_requests_total.inc(method, route_path, str(status_code))
+        http_request_duration.observe(duration, method, route_path)
+
+        # Successful requests on high-volume routes are only logged for a sample
+        path = scope["path"]
+        if status_code >= 400 or random.random() < self.sample_rates.get(path, 1.0):
+            logger.info(
+                "%s %s -> %d in %.1fms", method, path, status_code, duration * 1000,
+                extra={"method": method, "path": path, "route": route_path, "status": status_code,
+                       "duration_ms": round(duration * 1000, 2)},
+            )
+
+
+def app_middleware(application: FastAPI):
+    application.add_middleware(RequestMiddleware)
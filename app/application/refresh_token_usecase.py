@@ -1,4 +1,5 @@
 from collections.abc import AsyncGenerator
+from typing import Optional
 
 from fastapi.params import Depends
 
@@ -9,8 +10,8 @@ class RefreshTokenUseCase:
     def __init__(self, auth_service: AuthService):
         self.auth_service = auth_service
 
-    async def execute(self, token: str):
-        refreshed_token = await self.auth_service.refresh_access_token(token)
+    async def execute(self, token: str, client_ip: Optional[str] = None):
+        refreshed_token = await self.auth_service.refresh_access_token(token, client_ip)
         return refreshed_token
 
 async def get_refresh_token_use_case(
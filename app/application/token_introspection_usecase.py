@@ -0,0 +1,18 @@
+from typing import AsyncGenerator
+
+from fastapi.params import Depends
+
+from app.domain.services.auth_service import AuthService, get_auth_service
+
+
+class TokenIntrospectionUseCase:
+    def __init__(self, auth_service: AuthService):
+        self.auth_service = auth_service
+
+    async def execute(self, tokens: list[str]) -> list[dict]:
+        return await self.auth_service.introspect_tokens(tokens)
+
+async def get_token_introspection_use_case(
+        auth_service: AuthService = Depends(get_auth_service)
+) -> AsyncGenerator[TokenIntrospectionUseCase, None]:
+    return TokenIntrospectionUseCase(auth_service)
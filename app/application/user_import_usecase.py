@@ -0,0 +1,19 @@
+from typing import AsyncGenerator, Optional
+
+from fastapi.params import Depends
+
+from app.adapters.out.database.repositories.user_repository import UserRepository, get_user_repository
+from app.domain.services.user_import_service import UserImportReport, UserImportService
+
+
+class UserImportUseCase:
+    def __init__(self, import_service: UserImportService):
+        self.import_service = import_service
+
+    async def execute(self, path: str, file_format: Optional[str] = None) -> UserImportReport:
+        return await self.import_service.import_file(path, file_format)
+
+async def get_user_import_use_case(
+    user_repo: UserRepository = Depends(get_user_repository),
+) -> AsyncGenerator[UserImportUseCase, None]:
+    yield UserImportUseCase(UserImportService(user_repo))
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from fastapi.params import Depends
 
@@ -9,8 +9,8 @@ class UserLoggedUseCase:
     def __init__(self, auth_service: AuthService):
         self.auth_service = auth_service
 
-    async def execute(self, username: str, password: str):
-        return await self.auth_service.login_user(username, password)
+    async def execute(self, username: str, password: str, client_ip: Optional[str] = None):
+        return await self.auth_service.login_user(username, password, client_ip)
 
 async def get_loggedin_use_case(
         auth_service: AuthService = Depends(get_auth_service)
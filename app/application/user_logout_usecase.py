@@ -0,0 +1,18 @@
+from typing import AsyncGenerator
+
+from fastapi.params import Depends
+
+from app.domain.services.auth_service import AuthService, get_auth_service
+
+
+class UserLogoutUseCase:
+    def __init__(self, auth_service: AuthService):
+        self.auth_service = auth_service
+
+    async def execute(self, access_token: str):
+        await self.auth_service.logout(access_token)
+
+async def get_logout_use_case(
+        auth_service: AuthService = Depends(get_auth_service)
+) -> AsyncGenerator[UserLogoutUseCase, None]:
+    return UserLogoutUseCase(auth_service)
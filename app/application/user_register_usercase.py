@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from fastapi.params import Depends
 
@@ -10,8 +10,8 @@ class UserRegisterUseCase:
     def __init__(self, auth_service: AuthService):
         self.auth_service = auth_service
 
-    async def execute(self, user: UserCreate) -> User:
-        return await self.auth_service.create_user(user)
+    async def execute(self, user: UserCreate, client_ip: Optional[str] = None) -> User:
+        return await self.auth_service.create_user(user, client_ip)
 
 async def get_register_use_case(
     auth_service: AuthService = Depends(get_auth_service),
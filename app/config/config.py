@@ -1,19 +1,141 @@
 import json
 
-from pydantic import Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError
 from pydantic_settings import BaseSettings
 
 from app.config.exception.global_exception import GlobalException
 
 
+class AdmissionBudget(BaseModel):
+    """ Concurrency budget shared by one class of routes """
+    max_concurrency: int = 64
+    max_queue: int = 256
+    queue_timeout_seconds: float = 1.0
+
+
 class Config(BaseSettings):
     MONGO_URI: str = Field(..., description="MongoDB URI")
     DATABASE_NAME: str = Field(..., description="Database name")
+    MONGO_MAX_POOL_SIZE: int = Field(100, description="Connections per Mongo server, per worker process")
+    MONGO_MIN_POOL_SIZE: int = Field(0, description="Connections kept open per Mongo server")
+    MONGO_MAX_CONNECTING: int = Field(2, description="Connections a pool may establish concurrently")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = Field(
+        0, description="Fail an operation waiting this long for a pooled connection (0 = no limit)"
+    )
+    MONGO_COMPRESSORS: str = Field("", description="Wire compressors in preference order, e.g. 'zstd,snappy,zlib'")
+    MONGO_READ_PREFERENCE: str = Field(
+        "primary", description="Read preference for by-id user lookups (e.g. 'secondaryPreferred', 'nearest')"
+    )
+    MONGO_MAX_STALENESS_SECONDS: int = Field(
+        -1, description="Max secondary lag for those lookups (-1 = no limit, otherwise at least 90)"
+    )
+    MONGO_WARMUP_CONNECTIONS: int = Field(0, description="Connections opened at startup (0 = MONGO_MIN_POOL_SIZE)")
+    MONGO_INDEX_MODE: str = Field("create", description="Startup index handling ('create', 'verify', 'off')")
+    MONGO_INDEX_FAIL_ON_DRIFT: bool = Field(False, description="Abort startup when indexes are missing or differ")
     APP_ENV: str = Field(..., description="Application environment ('development', 'production')")
+    STARTUP_MODE: str = Field("eager", description="'eager' connects Mongo and starts pools at startup, 'lazy' on first use")
+    STARTUP_BUDGET_SECONDS: float = Field(0, description="Warn when the first response takes longer (0 = no budget)")
+    SERVER_HOST: str = Field("127.0.0.1", description="Interface the server binds to")
+    SERVER_PORT: int = Field(3010, description="Port the server listens on")
+    SERVER_WORKERS: int = Field(0, description="Serving processes in production mode (0 = one per CPU)")
+    SERVER_LOOP: str = Field("auto", description="Event loop ('auto', 'uvloop', 'asyncio'); auto prefers uvloop")
+    SERVER_HTTP: str = Field("auto", description="HTTP parser ('auto', 'httptools', 'h11'); auto prefers httptools")
+    SERVER_GRACEFUL_TIMEOUT: int = Field(30, description="Seconds in-flight requests get to finish on shutdown")
+    SERVER_KEEPALIVE_TIMEOUT: int = Field(5, description="Idle keep-alive connection timeout in seconds")
+    SERVER_BACKLOG: int = Field(2048, description="Pending connections the listening socket may queue")
+    SERVER_FORWARDED_ALLOW_IPS: str = Field(
+        "127.0.0.1", description="Proxies trusted for X-Forwarded-For (client IPs used by login throttling)"
+    )
     DEBUG: bool = Field(..., description="Debug mode")
     SECRET_KEY: str = Field(..., description="Secret key for jwt token")
     ACCESS_TOKEN_EXPIRE_MINUTES: float = Field(..., description="Token to Expire")
     REFRESH_SECRET_KEY: str = Field(..., description="Key to refresh token")
+    JWT_ALGORITHM: str = Field("HS256", description="Access token algorithm ('HS256', 'EdDSA', 'ES256')")
+    JWT_PRIVATE_KEY_FILES: str = Field("", description="Comma-separated PEM private keys, active key first (EdDSA/ES256)")
+    JWT_KEY_ROTATION_HOURS: float = Field(0, description="Reload key files or generate a new key this often (0 = never)")
+    JWT_KEY_OVERLAP_MINUTES: float = Field(60, description="How long a rotated-out key still verifies tokens")
+    JWKS_CACHE_SECONDS: int = Field(300, description="max-age advertised for /.well-known/jwks.json")
+    REFRESH_TOKEN_EXPIRE_MINUTES: float = Field(60 * 24 * 7, description="Refresh token lifetime")
+    REFRESH_TOKEN_STORE: str = Field("mongo", description="Refresh token store ('mongo', 'memory')")
+
+    LOG_LEVEL: str = Field("INFO", description="Root log level")
+    LOG_MODE: str = Field("queue", description="'queue' logs from a background thread, 'sync' inline")
+    LOG_FORMAT: str = Field("text", description="Log record format ('text', 'json')")
+    LOG_SAMPLE_RATES: dict[str, float] = Field(
+        default_factory=dict, description='Share of successful requests logged per path, e.g. {"/healthcheck": 0.01}'
+    )
+
+    PASSWORD_HASH_ALGORITHM: str = Field("bcrypt", description="Algorithm for new password hashes ('bcrypt', 'argon2')")
+    BCRYPT_ROUNDS: int = Field(12, description="bcrypt cost factor for new password hashes (4-31)")
+    ARGON2_TIME_COST: int = Field(3, description="Argon2id passes for new password hashes")
+    ARGON2_MEMORY_COST: int = Field(65536, description="Argon2id memory per hash, in KiB")
+    ARGON2_PARALLELISM: int = Field(4, description="Argon2id lanes per hash")
+    PASSWORD_HASH_TARGET_MS: float = Field(0, description="Calibrate the hash cost to this per-hash time at startup (0 = use the configured cost)")
+    PASSWORD_REHASH_ON_LOGIN: bool = Field(True, description="Upgrade hashes weaker than the current policy after a successful login")
+    PASSWORD_HASH_POOL: str = Field("thread", description="Password hashing pool type ('thread', 'process')")
+    PASSWORD_HASH_WORKERS: int = Field(0, description="Password hashing workers (0 = CPUs per serving process)")
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(64, description="Hashing operations allowed to wait for a worker")
+
+    USER_IMPORT_BATCH_SIZE: int = Field(1000, description="Rows validated, hashed and inserted per batch")
+    USER_IMPORT_HASH_POOL: str = Field("process", description="Import hashing pool type ('thread', 'process')")
+    USER_IMPORT_WORKERS: int = Field(0, description="Import hashing workers (0 = CPUs per serving process)")
+    USER_IMPORT_MAX_REPORTED_FAILURES: int = Field(1000, description="Failed rows listed in an import report")
+
+    TOKEN_CACHE_SIZE: int = Field(50000, description="Verified access tokens kept in memory (0 disables)")
+
+    PRINCIPAL_CACHE_SIZE: int = Field(10000, description="Authenticated users kept in memory (0 disables)")
+    PRINCIPAL_CACHE_TTL_SECONDS: float = Field(30, description="Lifetime of a cached authenticated user")
+
+    REVOCATION_SYNC_SECONDS: float = Field(2, description="How often each worker polls for tokens revoked elsewhere")
+    REVOCATION_GAP_GRACE_SECONDS: float = Field(10, description="Wait for a missing revocation sequence number before skipping it")
+
+    INTROSPECTION_MAX_BATCH: int = Field(100, description="Tokens accepted per /auth/introspect request")
+    INTROSPECTION_CACHE_SIZE: int = Field(50000, description="Introspection results kept in memory (0 disables)")
+    INTROSPECTION_CACHE_SECONDS: float = Field(5, description="Lifetime of a cached introspection result, also sent as max-age")
+
+    LOGIN_THROTTLE_ENABLED: bool = Field(True, description="Throttle logins before any password hashing")
+    LOGIN_THROTTLE_BACKEND: str = Field("memory", description="Throttle counters ('memory' per worker, 'mongo' shared)")
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = Field(900, description="Sliding window for failed login limits")
+    LOGIN_THROTTLE_MAX_PER_EMAIL: int = Field(10, description="Failed logins allowed per email in the window")
+    LOGIN_THROTTLE_MAX_PER_IP: int = Field(100, description="Failed logins allowed per client IP in the window")
+    LOGIN_BACKOFF_AFTER: int = Field(3, description="Failures per email before each attempt is delayed")
+    LOGIN_BACKOFF_BASE_SECONDS: float = Field(1, description="First backoff delay, doubled on every further failure")
+    LOGIN_BACKOFF_MAX_SECONDS: float = Field(60, description="Longest backoff delay")
+    LOGIN_LOCKOUT_THRESHOLD: int = Field(20, description="Consecutive failed logins that lock the account (0 = never)")
+    LOGIN_LOCKOUT_MINUTES: float = Field(15, description="How long a lockout lasts")
+    LOGIN_BOOKKEEPING_FLUSH_SECONDS: float = Field(1, description="Write-behind interval for last_login/failed login counters (0 = write through)")
+    LOGIN_BOOKKEEPING_MAX_PENDING: int = Field(1000, description="Users with buffered login bookkeeping that trigger an early flush")
+
+    REGISTERED_EMAIL_FILTER_ENABLED: bool = Field(True, description="Answer logins for unknown emails from an in-memory Bloom filter")
+    REGISTERED_EMAIL_FILTER_FP_RATE: float = Field(0.001, gt=0, lt=1, description="Target false positive rate of the registered email filter")
+    REGISTERED_EMAIL_FILTER_MAX_MB: int = Field(64, description="Memory cap of the registered email filter; past it the false positive rate rises")
+    REGISTERED_EMAIL_FILTER_BATCH_SIZE: int = Field(10000, description="Emails read per query when building the filter")
+    REGISTERED_EMAIL_SYNC_SECONDS: float = Field(
+        2, description="Poll interval for users registered by other workers, who cannot log in here until then"
+    )
+    REGISTERED_EMAIL_REBUILD_MINUTES: float = Field(60, description="Interval between full rebuilds of the registered email filter")
+
+    AUDIT_LOG_ENABLED: bool = Field(True, description="Write login, refresh and registration events to Parquet")
+    AUDIT_LOG_DIR: str = Field("logs/audit", description="Root of the day-partitioned audit log files")
+    AUDIT_QUEUE_SIZE: int = Field(10000, description="Audit events waiting to be written before new ones are dropped")
+    AUDIT_BATCH_SIZE: int = Field(1000, description="Audit events written per Parquet row group")
+    AUDIT_FLUSH_SECONDS: float = Field(5, description="Longest an audit event waits for its batch to fill")
+    AUDIT_MAX_FILE_MB: int = Field(64, description="Size at which an audit log file is rotated")
+    AUDIT_MAX_ROW_GROUPS: int = Field(100, description="Batches appended to an audit log file before it is rotated (each append rewrites the footer)")
+    AUDIT_MAX_FILE_MINUTES: float = Field(60, description="Age at which an audit log file is rotated")
+    AUDIT_COMPRESSION: str = Field("ZSTD", description="Parquet codec for audit logs: ZSTD, SNAPPY, GZIP, LZ4, BROTLI or UNCOMPRESSED")
+
+    ADMISSION_CONTROL_ENABLED: bool = Field(True, description="Shed load with 503s once a route budget is exhausted")
+    ADMISSION_BUDGETS: dict[str, AdmissionBudget] = Field(
+        default_factory=lambda: {
+            # Routes that hash passwords
+            "credentials": AdmissionBudget(max_concurrency=16, max_queue=64, queue_timeout_seconds=2.0),
+            # Gateway token checks: no hashing, but a batch per call; fail fast rather than stall the gateway
+            "introspection": AdmissionBudget(max_concurrency=32, max_queue=128, queue_timeout_seconds=0.5),
+            "default": AdmissionBudget(),
+        },
+        description='Budgets by name, e.g. {"credentials": {"max_concurrency": 16, "max_queue": 64}}',
+    )
 
     class Config:
         env_file = ".env"
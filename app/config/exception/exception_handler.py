@@ -2,25 +2,33 @@ import traceback
 from logging import getLogger
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException
 
+from app.adapters.out.security.password_executor import PoolSaturated
 from app.config.exception.global_exception import GlobalException
+from app.config.server.responses import DefaultJSONResponse
 logger = getLogger(__name__)
 
 def register_exception_handler(app: FastAPI):
-    print("Registering exception handler")
-
     # Handle custom exceptions
     @app.exception_handler(GlobalException)
     async def app_exception_handler(request: Request, exc: GlobalException):
-        logger.error(f"AppException: {exc.message} - {exc.detail}")
-        print('app_exception_handler triggered')  # Debug print
-        return JSONResponse(
+        logger.error("AppException: %s - %s", exc.message, exc.detail)
+        return DefaultJSONResponse(
             content={"error": exc.message, "detail": exc.detail},
             status_code=exc.status,
         )
 
+    # Load shed by the password hashing pool, answered like admission control
+    @app.exception_handler(PoolSaturated)
+    async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+        logger.warning("Password hashing pool saturated at %s", request.url)
+        return DefaultJSONResponse(
+            content={"error": "Server busy, please retry"},
+            status_code=503,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
     # Handle unhandled exceptions
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
@@ -31,9 +39,9 @@ def register_exception_handler(app: FastAPI):
             "url": str(request.url),
             "traceback": traceback.format_exc()
         }
-        logger.error(f"Unhandled Exception: {error_message}")  # Logs full stack trace
+        logger.error("Unhandled Exception: %s", error_message)  # Logs full stack trace
 
-        return JSONResponse(
+        return DefaultJSONResponse(
             status_code=500,
             content={"error": "Internal Server Error", "details": str(exc)}
         )
@@ -42,15 +50,14 @@ def register_exception_handler(app: FastAPI):
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         if exc.status_code == 404:
-            logger.warning(f"404 error at {request.url}")
-            print('http_exception_handler triggered for 404')  # Debug print
-            return JSONResponse(
+            logger.warning("404 error at %s", request.url)
+            return DefaultJSONResponse(
                 content={"error": "Not Found", "detail": "The requested resource was not found."},
                 status_code=404,
             )
-        logger.warning(f"HTTP exception: {exc.detail} at {request.url}")
-        print('http_exception_handler triggered')  # Debug print
-        return JSONResponse(
+        logger.warning("HTTP exception: %s at %s", exc.detail, request.url)
+        return DefaultJSONResponse(
             content={"error": exc.detail},
             status_code=exc.status_code,
+            headers=getattr(exc, "headers", None),  # e.g. Retry-After on 429/503
         )
\ No newline at end of file
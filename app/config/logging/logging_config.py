@@ -1,11 +1,62 @@
+import atexit
+import json
 import logging
 import logging.config
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+from app.config.config import app_config
+
 logging.getLogger("pymongo").setLevel(logging.WARNING)
 
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """ One compact JSON object per record, `extra=` fields included """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records untouched.
+
+    The stock handler formats the message on the calling thread; the listener runs
+    in the same process, so formatting is left to it and the event loop only pays
+    for a queue put.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 def setup_logging():
     """
     Set up logging configuration for the application.
+
+    LOG_MODE 'queue' hands records to a background listener thread so slow stdout
+    writes never block the event loop; 'sync' writes from the calling thread.
     """
+    global _listener
+    stop_logging()  # Reconfiguring, e.g. when the app is created again
+
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
     logging_config = {
@@ -18,19 +69,43 @@ def setup_logging():
             "detailed": {
                 "format": "%(asctime)s - %(name)s - %(levelname)s - %(module)s - %(message)s",
             },
+            "json": {
+                "()": JsonFormatter,
+            },
         },
         "handlers": {
             "console": {
                 "class": "logging.StreamHandler",
-                "formatter": "default",
-                "level": "DEBUG",
+                "formatter": "json" if app_config.LOG_FORMAT == "json" else "default",
+                "level": app_config.LOG_LEVEL,
             },
         },
         "root": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": app_config.LOG_LEVEL,
         },
     }
 
     # Configure logging
-    logging.config.dictConfig(logging_config)
\ No newline at end of file
+    logging.config.dictConfig(logging_config)
+
+    if app_config.LOG_MODE == "queue":
+        root = logging.getLogger()
+        handlers = root.handlers[:]
+        records = queue.SimpleQueue()
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(LazyQueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging():
+    """ Drain queued records and stop the listener thread """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Optional
+
+logger = getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Time spent getting a process ready to serve, by phase.
+
+    The clock starts when this module is first imported, which `main` does before
+    anything else. Phases are recorded as they happen (a lazily started database
+    is measured when it is first used), and the report is logged once the first
+    response has been sent, checked against a startup budget.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None  # Lifespan startup finished
+        self.first_response_seconds: Optional[float] = None
+        self.budget_seconds = 0.0
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - start
+
+    def mark_ready(self):
+        if self.ready_seconds is None:
+            self.ready_seconds = time.perf_counter() - self.started
+
+    def mark_first_response(self):
+        """ Called for every response; only the first one is recorded """
+        if self.first_response_seconds is not None:
+            return
+        self.first_response_seconds = time.perf_counter() - self.started
+        report = self.report()
+        logger.info(
+            "Startup: first response after %.3fs (ready after %.3fs) - %s", self.first_response_seconds,
+            self.ready_seconds or 0.0, ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.phases.items()),
+            extra={"startup": report},
+        )
+        if report["within_budget"] is False:
+            logger.warning("Startup took %.3fs, over the %.3fs budget (STARTUP_BUDGET_SECONDS)",
+                           self.first_response_seconds, self.budget_seconds)
+
+    def report(self) -> dict:
+        within_budget = None
+        if self.budget_seconds and self.first_response_seconds is not None:
+            within_budget = self.first_response_seconds <= self.budget_seconds
+        return {
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+            "ready_seconds": round(self.ready_seconds, 4) if self.ready_seconds is not None else None,
+            "first_response_seconds": (
+                round(self.first_response_seconds, 4) if self.first_response_seconds is not None else None
+            ),
+            "budget_seconds": self.budget_seconds or None,
+            "within_budget": within_budget,
+        }
+
+
+startup_timer = StartupTimer()
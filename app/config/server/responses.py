@@ -0,0 +1,7 @@
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # noqa: F401 - only checking it is installed
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:  # Same output through the standard library encoder, just slower
+    DefaultJSONResponse = JSONResponse
@@ -0,0 +1,25 @@
+import os
+
+from app.config.config import app_config
+
+
+def available_cpus() -> int:
+    """ CPUs this process may run on (respects affinity/cpusets, e.g. in containers) """
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def server_workers() -> int:
+    """ Serving processes: SERVER_WORKERS, or one per CPU when it is 0 """
+    return app_config.SERVER_WORKERS or available_cpus()
+
+
+def cpus_per_worker() -> int:
+    """
+    CPU share of one serving process.
+
+    Only the production launcher runs several workers and it exports the resolved
+    SERVER_WORKERS to them; any other process (dev server, CLI) has the machine.
+    """
+    return max(1, available_cpus() // max(1, app_config.SERVER_WORKERS))
@@ -0,0 +1,139 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Optional
+
+from app.adapters.out.files.audit_log_writer import ParquetAuditWriter
+from app.config.config import app_config
+from app.config.metrics.metrics import Counter, registry
+
+logger = getLogger(__name__)
+
+audit_events_total = registry.add(Counter(
+    "audit_events_total", "Authentication audit events, by event and outcome", ("event", "result")
+))
+
+
+class AuditLog:
+    """
+    Append-only audit trail of logins, token refreshes and registrations.
+
+    `emit` only puts the event on a bounded queue and never waits: when the queue is
+    full the event is dropped and counted. A background task drains the queue in
+    batches of AUDIT_BATCH_SIZE, or every AUDIT_FLUSH_SECONDS, and writes them to
+    Parquet in a thread; whatever is left is written on shutdown.
+    """
+    _instance = None  # Singleton instance
+
+    def __init__(self, writer: Optional[ParquetAuditWriter], queue_size: int, batch_size: int, flush_seconds: float):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: asyncio.Queue[tuple] = asyncio.Queue(maxsize=queue_size)
+        self._running = False
+        self._batch: list[tuple] = []  # Taken off the queue, not written yet
+        self._last_write: Optional[asyncio.Future] = None
+        self.emitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed_batches = 0
+
+    @classmethod
+    def get_instance(cls) -> "AuditLog":
+        if cls._instance is None:
+            writer = ParquetAuditWriter(
+                app_config.AUDIT_LOG_DIR, app_config.AUDIT_MAX_FILE_MB * 1024 * 1024, app_config.AUDIT_COMPRESSION,
+                app_config.AUDIT_MAX_ROW_GROUPS, app_config.AUDIT_MAX_FILE_MINUTES * 60,
+            ) if app_config.AUDIT_LOG_ENABLED else None
+            cls._instance = cls(
+                writer, app_config.AUDIT_QUEUE_SIZE, app_config.AUDIT_BATCH_SIZE, app_config.AUDIT_FLUSH_SECONDS
+            )
+        return cls._instance
+
+    @classmethod
+    @asynccontextmanager
+    async def initialize(cls):
+        """ Context manager running the background writer, writing out the queue on exit """
+        instance = cls.get_instance()
+        if instance.writer is None:
+            yield instance
+            return
+        instance._running = True
+        task = asyncio.create_task(instance.run())
+        try:
+            yield instance
+        finally:
+            instance._running = False
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            if instance._last_write is not None:
+                await instance._last_write  # A batch still being written when the task was cancelled
+            remaining, instance._batch = instance._batch + instance._take(instance._queue.qsize()), []
+            for start in range(0, len(remaining), instance.batch_size):
+                await instance._write(remaining[start:start + instance.batch_size])
+
+    def emit(self, event: str, user_id=None, email: Optional[str] = None,
+             client_ip: Optional[str] = None, detail: Optional[str] = None):
+        """ Queue an audit event without waiting; dropped when the queue is full """
+        if not self._running:
+            return
+        record = (datetime.now(timezone.utc), event, str(user_id) if user_id else None, email, client_ip, detail)
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            audit_events_total.inc(event, "dropped")
+            return
+        self.emitted += 1
+        audit_events_total.inc(event, "queued")
+
+    async def run(self):
+        """ Write a batch once `batch_size` events are queued or `flush_seconds` after the first one """
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_seconds
+            while len(self._batch) < self.batch_size:
+                self._batch.extend(self._take(self.batch_size - len(self._batch)))
+                remaining = deadline - loop.time()
+                if len(self._batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            await self._write(batch)
+
+    def _take(self, limit: int) -> list[tuple]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: list[tuple]):
+        # Shielded, so a cancelled writer task never leaves a thread appending next to the final flush
+        self._last_write = asyncio.ensure_future(self._write_batch(batch))
+        await asyncio.shield(self._last_write)
+
+    async def _write_batch(self, batch: list[tuple]):
+        try:
+            await asyncio.to_thread(self.writer.write, batch)
+        except Exception:
+            # Audit events are best effort: a broken disk must not back up the queue
+            self.failed_batches += 1
+            logger.exception("Writing %d audit events failed, dropping them", len(batch))
+            return
+        self.written += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.writer is not None,
+            "queued": self._queue.qsize(),
+            "emitted": self.emitted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "files": self.writer.files_written if self.writer else 0,
+        }
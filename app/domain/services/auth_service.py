@@ -1,23 +1,34 @@
-import os
-from base64 import b64decode
+import asyncio
+from uuid import uuid4
 from datetime import datetime, timedelta
 from typing import AsyncGenerator, Optional
 
 from fastapi import Depends, HTTPException, status
-from fastapi_users import jwt
 import jwt as pyJwt
-from jwt import ExpiredSignatureError, InvalidTokenError
+from pymongo.errors import DuplicateKeyError
 
-from app.adapters.out.database.repositories.user_repository import UserRepository
+from app.adapters.out.cache.introspection_cache import IntrospectionCache
+from app.adapters.out.cache.principal_cache import PrincipalCache
+from app.adapters.out.cache.token_cache import VerifiedTokenCache
+from app.adapters.out.database.repositories.user_repository import UserRepository, get_user_repository
 from app.adapters.out.database.entities.user import User, UserCreate
+from app.adapters.out.database.entities.user_projections import UserClaims, UserCredentials, UserPrincipal
+from app.adapters.out.security.password_executor import PoolSaturated
 from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+from app.config.metrics.metrics import Counter, registry, timed_stage
+from app.domain.services.audit_log import AuditLog
+from app.domain.services.login_throttler import LoginThrottler
+from app.domain.services.token_keys import AUDIENCE, JwtKey, JwtKeyRing, TokenKeys, reload_access_keys
+from app.domain.services.token_revocation import TokenRevocationList
 from logging import getLogger
 
 logger = getLogger(__name__)
 
-# Convert bytes to string for JWT strategy
-SECRET = b64decode(app_config.SECRET_KEY)
-ALGORITHM = "HS256"
+password_rehash_total = registry.add(Counter(
+    "password_rehash_total", "Outdated password hashes upgraded after login, by outcome", ("result",)
+))
+_rehash_tasks: set[asyncio.Task] = set()  # Strong references to running upgrades
 
 
 class AuthService:
@@ -25,32 +36,78 @@ class AuthService:
 
     def __init__(self, user_repo: UserRepository):
         self.user_repo = user_repo
+        self.keys = TokenKeys.get_instance()
+        self.token_cache = VerifiedTokenCache.get_instance()
+        self.throttler = LoginThrottler.get_instance()
+        self.revocations = TokenRevocationList.get_instance()
+        self.audit = AuditLog.get_instance()
 
-    async def create_user(self, user: UserCreate) -> User:
-        """ Register a new user programmatically """
-        existing_user = await self.user_repo.get_user_by_email(user.email)
-        if existing_user:
-            logger.warning(f"User with email {user.email} already exists.")
+    async def create_user(self, user: UserCreate, client_ip: Optional[str] = None) -> User:
+        """ Register a new user programmatically, relying on the unique email index """
+        try:
+            # Without is_superuser/is_active/is_verified: privileges are never self-assigned
+            new_user = await self.user_repo.create_user(user.create_update_dict())
+        except DuplicateKeyError:
+            logger.warning("User with email %s already exists.", user.email)
+            self.audit.emit("register_failed", email=user.email, client_ip=client_ip, detail="email_taken")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
-        new_user = await self.user_repo.create_user(user.dict())
-        logger.info(f"User {new_user.id} created successfully")
+        logger.info("User %s created successfully", new_user.id)
+        self.audit.emit("registered", new_user.id, user.email, client_ip)
         return new_user
 
-    async def login_user(self, email: str, password: str) -> str:
+    async def login_user(self, email: str, password: str, client_ip: Optional[str] = None) -> dict:
         """ Authenticate user and return JWT token """
-        user = await self.user_repo.get_user_by_email(email)
+        # Cheap rejections first: throttling needs no database read and no hashing
+        try:
+            await self.throttler.check(email, client_ip)
+        except HTTPException:
+            self.audit.emit("login_throttled", email=email, client_ip=client_ip)
+            raise
+
+        user = await self.user_repo.get_credentials_by_email(email)
+        if user and user.lock_active and user.locked_until is not None:
+            self.audit.emit("login_throttled", user.id, email, client_ip, "locked")
+            self.throttler.reject("locked", (user.locked_until - datetime.utcnow()).total_seconds())
+
+        if not user:
+            await self.user_repo.spend_verify_time()  # Unknown emails must not answer faster
         if not user or not await self.user_repo.verify_password(password, user.hashed_password):
+            await self.throttler.record_failure(email, client_ip)
+            if user:
+                await self._record_failed_login(user)
+            self.audit.emit(
+                "login_failed", user.id if user else None, email, client_ip,
+                "wrong_password" if user else "unknown_email",
+            )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
             )
-        access_token = self.generate_jwt(user)
-        refresh_token = self.generate_refresh_token(user)
+        if not user.is_active or user.lock_active:
+            self.audit.emit("login_failed", user.id, email, client_ip, "disabled")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Account is disabled",
+            )
+
+        await self.throttler.record_success(email)
+        await self.user_repo.record_successful_login(
+            user.id, clear_failures=bool(user.failed_log_attempts or user.is_locked)
+        )
+        if app_config.PASSWORD_REHASH_ON_LOGIN and self.user_repo.password_needs_rehash(user.hashed_password):
+            task = asyncio.create_task(self._upgrade_password_hash(user, password))
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
 
-        await self.user_repo.save_refresh_token(str(user.id), refresh_token)
+        token_id = uuid4().hex
+        access_token = self.generate_jwt(user, token_id)
+        refresh_token, expires_at = self.generate_refresh_token(user, token_id)
+
+        await self.user_repo.save_refresh_token(token_id, str(user.id), refresh_token, expires_at)
+        self.audit.emit("login_succeeded", user.id, email, client_ip)
 
         return {
             "access_token": access_token,
@@ -58,67 +115,106 @@ class AuthService:
             "token_type": "bearer"
         }
 
-    def generate_jwt(self, user: User) -> str:
-        """ Generate JWT token with user information """
+    async def _record_failed_login(self, user: UserCredentials):
+        """ Count the failure on the account and lock it once LOGIN_LOCKOUT_THRESHOLD is reached """
+        failures = await self.user_repo.record_failed_login(user.id, user.failed_log_attempts)
+        threshold = app_config.LOGIN_LOCKOUT_THRESHOLD
+        if threshold and failures >= threshold:
+            until = datetime.utcnow() + timedelta(minutes=app_config.LOGIN_LOCKOUT_MINUTES)
+            await self.user_repo.lock_until(user.id, until)
+            logger.warning("Account %s locked until %s after %d failed logins", user.id, until.isoformat(), failures)
+
+    async def _upgrade_password_hash(self, user: UserCredentials, password: str):
+        """ Background rehash after a login; the response does not wait for it """
         try:
-            payload = self.get_payload(user)
-            return jwt.generate_jwt(payload, secret=SECRET, algorithm=ALGORITHM)
+            upgraded = await self.user_repo.upgrade_password_hash(user.id, password, user.hashed_password)
+        except PoolSaturated as e:
+            # The next login retries
+            password_rehash_total.inc("skipped")
+            logger.debug("Password hash upgrade for %s skipped: %s", user.id, e)
+            return
+        except Exception:
+            password_rehash_total.inc("error")
+            logger.exception("Password hash upgrade for %s failed", user.id)
+            return
+        # Not upgraded when the password changed meanwhile: the newer hash wins
+        password_rehash_total.inc("upgraded" if upgraded else "conflict")
+        if upgraded:
+            logger.info("Password hash of %s upgraded", user.id)
+
+    def generate_jwt(self, user: UserClaims, token_id: Optional[str] = None) -> str:
+        """ Generate JWT token with user information, tied to the refresh token session `token_id` """
+        try:
+            payload = self.get_payload(user, token_id)
+            with timed_stage("jwt_encode"):
+                return self.keys.access.encode(payload)
 
         except Exception as e:
             logger.exception("Error generating JWT")
             raise
 
-    def generate_refresh_token(self, user: User) -> str:
-        """ Generate a long-lived JWT refresh token """
+    def generate_refresh_token(self, user: UserClaims, token_id: str) -> tuple[str, datetime]:
+        """ Generate a long-lived JWT refresh token for the session `token_id` """
         try:
-            payload = self.get_payload(user)
-            refresh_token = jwt.generate_jwt(
-                payload,
-                app_config.REFRESH_SECRET_KEY,
-                algorithm=ALGORITHM
-            )
-            return refresh_token
+            expires_at = (
+                datetime.utcnow() + timedelta(minutes=app_config.REFRESH_TOKEN_EXPIRE_MINUTES)
+            ).replace(microsecond=0)  # `exp` has second precision
+            payload = {
+                "sub": str(user.id),
+                "tid": token_id,
+                "jti": uuid4().hex,  # Makes every rotated token unique
+                "aud": AUDIENCE,
+                "exp": expires_at,
+            }
+            with timed_stage("jwt_encode"):
+                return self.keys.refresh.encode(payload), expires_at
         except Exception as e:
             logger.exception("Error generating JWT")
             raise
 
-    async def refresh_access_token(self, refresh_token: str) -> str:
-        """ Validate refresh token and issue a new access token """
-        try:
-            payload = self.decode_jwt(
-                refresh_token,
-                app_config.REFRESH_SECRET_KEY
+    async def refresh_access_token(self, refresh_token: str, client_ip: Optional[str] = None) -> dict:
+        """ Validate and rotate a refresh token, issuing a new access token """
+        payload = self.decode_jwt(refresh_token, self.keys.refresh)
+        user_id = payload.get("sub") if payload else None
+        token_id = payload.get("tid") if payload else None
+        if not user_id or not token_id:
+            self.audit.emit("refresh_failed", client_ip=client_ip, detail="invalid_token")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
             )
-            print(payload)
-            user_id = payload.get("sub")
-            if not user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid refresh token"
-                )
-
-            user = await self.user_repo.get_user_by_id(user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="User not found"
-                )
-
-            return self.generate_jwt(user)
-
-        except ExpiredSignatureError:
+
+        user = await self.user_repo.get_claims_by_id(user_id)
+        if not user:
+            self.audit.emit("refresh_failed", user_id, client_ip=client_ip, detail="unknown_user")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Refresh token expired"
+                detail="User not found"
             )
-        except InvalidTokenError:
+
+        new_refresh_token, expires_at = self.generate_refresh_token(user, token_id)
+        rotated = await self.user_repo.rotate_refresh_token(
+            token_id, user_id, refresh_token, new_refresh_token, expires_at
+        )
+        if not rotated:
+            # A validly signed token that no longer matches was already used: end the session
+            logger.warning("Refresh token reuse detected for session %s", token_id)
+            await self.user_repo.revoke_refresh_token(token_id)
+            self.audit.emit("refresh_failed", user_id, user.email, client_ip, "token_reuse")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
 
-    def get_payload(self, user: User) -> Optional[dict]:
+        self.audit.emit("refreshed", user_id, user.email, client_ip)
         return {
+            "access_token": self.generate_jwt(user, token_id),
+            "refresh_token": new_refresh_token,
+            "token_type": "bearer"
+        }
+
+    def get_payload(self, user: UserClaims, token_id: Optional[str] = None) -> Optional[dict]:
+        payload = {
                 "sub": str(user.id),
                 "email": user.email,
                 "name": user.name,
@@ -128,24 +224,115 @@ class AuthService:
                 "isLocked": user.is_locked,
                 "createdAt": user.created_at.isoformat(),
                 "updatedAt": user.updated_at.isoformat(),
-                "aud": "api",
+                "aud": AUDIENCE,
                 "exp": datetime.utcnow() + timedelta(minutes=app_config.ACCESS_TOKEN_EXPIRE_MINUTES),
+                "jti": uuid4().hex,  # Lets the token be revoked before it expires
             }
+        if token_id:
+            payload["tid"] = token_id  # Logout also ends the refresh token session
+        return payload
 
-    def decode_jwt(self, token: str, SECRET_TO_DECODE: str) -> Optional[dict]:
-        """ Decode JWT token and extract payload """
+    def decode_jwt(self, token: str, key: Optional[JwtKey] = None) -> Optional[dict]:
+        """ Decode and verify a JWT (an access token unless `key` says otherwise) """
+        key = key or self.keys.access
+        # Refresh tokens are single-use after rotation, caching them would not pay off
+        cacheable = key is self.keys.access
+        if cacheable:
+            payload = self.token_cache.get(key.purpose, token)
+            if payload is not None:
+                return payload
         try:
-            return jwt.decode_jwt(
-                token,
-                SECRET_TO_DECODE,
-                algorithms=[ALGORITHM],
-                audience = ["api"]
-            )
+            with timed_stage("jwt_decode"):
+                payload = key.decode(token)
         except pyJwt.PyJWTError:
             return None
+        if cacheable:
+            self.token_cache.set(key.purpose, token, payload)
+        return payload
+
+    async def introspect_tokens(self, tokens: list[str]) -> list[dict]:
+        """
+        RFC 7662-style status of a batch of access tokens, in request order.
+
+        Each distinct token is verified once, and the users behind all of them are read
+        with a single query, for those not already in the principal cache.
+        """
+        introspection_cache = IntrospectionCache.get_instance()
+        results: dict[str, dict] = {}
+        payloads: dict[str, dict] = {}
+        for token in dict.fromkeys(tokens):
+            cached = introspection_cache.get(token)
+            if cached is not None:
+                results[token] = {"active": False} if self.revocations.is_revoked(cached.get("jti")) else cached
+                continue
+            payload = self.decode_jwt(token)
+            if payload and payload.get("sub"):
+                payloads[token] = payload
+            else:
+                results[token] = {"active": False}
+                introspection_cache.set(token, results[token])
+
+        if payloads:
+            principals = await PrincipalCache.get_instance().get_many_or_load(
+                (payload["sub"] for payload in payloads.values()), self.user_repo.get_principals_by_ids
+            )
+            for token, payload in payloads.items():
+                results[token] = self._introspection(payload, principals.get(payload["sub"]))
+                introspection_cache.set(token, results[token])
+
+        return [results[token] for token in tokens]
+
+    def _introspection(self, payload: dict, user: Optional[UserPrincipal]) -> dict:
+        """ Claims of a verified token, active only while it is not revoked and its user still may sign in """
+        if self.revocations.is_revoked(payload.get("jti")) or not user or not user.is_active or user.lock_active:
+            return {"active": False}
+        return {
+            "active": True,
+            "token_type": "access_token",
+            "sub": payload["sub"],
+            "username": user.email,
+            "name": user.name,
+            "is_staff": user.is_staff,
+            "is_superuser": user.is_superuser,
+            "aud": payload.get("aud"),
+            "exp": payload.get("exp"),
+            "jti": payload.get("jti"),
+        }
+
+    async def logout(self, access_token: str):
+        """ Revoke an access token and end the refresh token session it was issued with """
+        payload = self.decode_jwt(access_token)
+        if not payload or not payload.get("sub"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+            )
+        if payload.get("jti"):
+            await self.revocations.revoke(payload["jti"], payload["sub"], payload["exp"])
+        if payload.get("tid"):
+            await self.user_repo.revoke_refresh_token(payload["tid"])
+        logger.info("User %s logged out", payload["sub"])
+        self.audit.emit("logout", payload["sub"])
+
+    def rotate_signing_keys(self):
+        """ Reload the key files, or switch to a freshly generated key when none are configured """
+        if not isinstance(self.keys.access, JwtKeyRing):
+            raise GlobalException("Key rotation requires an asymmetric JWT_ALGORITHM", 400)
+        reload_access_keys(self.keys.access)
+
+
+async def run_signing_key_rotation(interval_seconds: float):
+    """ Background task rotating the access token signing keys """
+    auth_service = AuthService(UserRepository())
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            auth_service.rotate_signing_keys()
+        except Exception:
+            logger.exception("Signing key rotation failed")
 
 # Dependency injection for AuthService
 async def get_auth_service(
-    user_repo: UserRepository = Depends(UserRepository),
+    user_repo: UserRepository = Depends(get_user_repository),
 ) -> AsyncGenerator[AuthService, None]:
     yield AuthService(user_repo)
\ No newline at end of file
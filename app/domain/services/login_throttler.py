@@ -0,0 +1,88 @@
+import math
+import time
+from logging import getLogger
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.adapters.out.throttle.login_throttle_backends import ThrottleBackend, get_throttle_backend
+from app.config.config import app_config
+from app.config.metrics.metrics import Counter, registry
+
+logger = getLogger(__name__)
+
+login_throttled_total = registry.add(Counter(
+    "login_throttled_total", "Login attempts rejected before password verification", ("reason",)
+))
+
+
+class LoginThrottler:
+    """
+    Failed-login limits checked before any database or hashing work.
+
+    Failures are counted per email and per client IP over a sliding window. Past
+    LOGIN_BACKOFF_AFTER failures an email also has to wait an exponentially growing
+    delay between attempts. Rejections are 429s carrying Retry-After.
+    """
+    _instance = None  # Singleton instance
+
+    def __init__(self, backend: ThrottleBackend):
+        self.backend = backend
+        self.window_seconds = app_config.LOGIN_THROTTLE_WINDOW_SECONDS
+
+    @classmethod
+    def get_instance(cls) -> "LoginThrottler":
+        if cls._instance is None:
+            cls._instance = cls(get_throttle_backend())
+        return cls._instance
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return "email:" + email.strip().lower()
+
+    async def check(self, email: str, client_ip: Optional[str]):
+        """ Raise a 429 if this attempt must not reach password verification """
+        if not app_config.LOGIN_THROTTLE_ENABLED:
+            return
+
+        email_state = await self.backend.get(self._email_key(email), self.window_seconds)
+        limit_wait = email_state.seconds_until_below(app_config.LOGIN_THROTTLE_MAX_PER_EMAIL, self.window_seconds)
+        if limit_wait > 0:
+            self.reject("email", limit_wait)
+
+        if client_ip:
+            ip_state = await self.backend.get("ip:" + client_ip, self.window_seconds)
+            limit_wait = ip_state.seconds_until_below(app_config.LOGIN_THROTTLE_MAX_PER_IP, self.window_seconds)
+            if limit_wait > 0:
+                self.reject("ip", limit_wait)
+
+        excess = int(email_state.failures) - app_config.LOGIN_BACKOFF_AFTER
+        if excess >= 0 and email_state.last_failure is not None:
+            delay = min(app_config.LOGIN_BACKOFF_BASE_SECONDS * 2 ** excess, app_config.LOGIN_BACKOFF_MAX_SECONDS)
+            backoff_wait = email_state.last_failure + delay - time.time()
+            if backoff_wait > 0:
+                self.reject("backoff", backoff_wait)
+
+    async def record_failure(self, email: str, client_ip: Optional[str]):
+        if not app_config.LOGIN_THROTTLE_ENABLED:
+            return
+        await self.backend.add_failure(self._email_key(email), self.window_seconds)
+        if client_ip:
+            await self.backend.add_failure("ip:" + client_ip, self.window_seconds)
+
+    async def record_success(self, email: str):
+        """ Clear the email's failures; the IP keeps its count so one valid account does not reset a spray """
+        if not app_config.LOGIN_THROTTLE_ENABLED:
+            return
+        await self.backend.reset(self._email_key(email), self.window_seconds)
+
+    @staticmethod
+    def reject(reason: str, wait_seconds: float):
+        """ Refuse a login attempt for `wait_seconds` """
+        login_throttled_total.inc(reason)
+        logger.info("Login throttled (%s) for %.0fs", reason, wait_seconds)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(wait_seconds)))},
+        )
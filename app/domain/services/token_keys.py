@@ -0,0 +1,190 @@
+import hashlib
+import json
+import time
+from base64 import b64decode, urlsafe_b64encode
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt as pyJwt
+
+from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+
+logger = getLogger(__name__)
+
+AUDIENCE = "api"
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+
+# JWK members that identify a public key (RFC 7638), per key type
+_THUMBPRINT_MEMBERS = {"OKP": ("crv", "kty", "x"), "EC": ("crv", "kty", "x", "y")}
+
+
+class JwtKey:
+    """ Prepared key material for one kind of token """
+
+    def __init__(self, purpose: str, algorithm: str, signing_key: Any, verification_key: Any,
+                 kid: Optional[str] = None):
+        self.purpose = purpose
+        self.algorithm = algorithm
+        self.algorithms = [algorithm]  # Reused list for decode()
+        self.kid = kid
+        self.headers = {"kid": kid} if kid else None
+        # Parse once here instead of on every encode/decode call
+        jwt_algorithm = pyJwt.get_algorithm_by_name(algorithm)
+        self.signing_key = jwt_algorithm.prepare_key(signing_key)
+        self.verification_key = jwt_algorithm.prepare_key(verification_key)
+
+    def encode(self, payload: dict) -> str:
+        return pyJwt.encode(payload, self.signing_key, algorithm=self.algorithm, headers=self.headers)
+
+    def decode(self, token: str) -> dict:
+        """ Verify signature, expiry and audience; raises pyJwt.PyJWTError """
+        return pyJwt.decode(token, self.verification_key, algorithms=self.algorithms, audience=AUDIENCE)
+
+    def public_jwk(self) -> dict:
+        """ Public half of an asymmetric key as a JWK """
+        jwk = pyJwt.get_algorithm_by_name(self.algorithm).to_jwk(self.verification_key, as_dict=True)
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+def generate_private_key(algorithm: str):
+    """ Fresh private key for an asymmetric algorithm """
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def load_private_key(path: str):
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    return load_pem_private_key(Path(path).read_bytes(), password=None)
+
+
+def build_signing_key(purpose: str, algorithm: str, private_key) -> JwtKey:
+    """ JwtKey for a private key, identified by its RFC 7638 thumbprint """
+    public_key = private_key.public_key()
+    jwk = pyJwt.get_algorithm_by_name(algorithm).to_jwk(public_key, as_dict=True)
+    members = _THUMBPRINT_MEMBERS.get(jwk["kty"])
+    if members is None or (algorithm == "EdDSA") != (jwk["kty"] == "OKP"):
+        raise GlobalException(f"Key type {jwk['kty']} cannot be used with {algorithm}", 500)
+    canonical = json.dumps({member: jwk[member] for member in members}, separators=(",", ":"), sort_keys=True)
+    kid = urlsafe_b64encode(hashlib.sha256(canonical.encode()).digest()).rstrip(b"=").decode()
+    return JwtKey(purpose, algorithm, private_key, public_key, kid=kid)
+
+
+class JwtKeyRing:
+    """
+    Asymmetric signing keys selected by `kid`.
+
+    Tokens are signed with the active key. After a rotation the previous keys stay
+    valid for verification, and in the JWKS, for `overlap_seconds` so tokens issued
+    just before the rotation keep working until they expire.
+    """
+
+    def __init__(self, purpose: str, algorithm: str, overlap_seconds: float):
+        self.purpose = purpose
+        self.algorithm = algorithm
+        self.overlap_seconds = overlap_seconds
+        self.active: Optional[JwtKey] = None
+        self._keys: dict[str, JwtKey] = {}
+        self._retire_at: dict[str, float] = {}
+        self._jwks: Optional[tuple[bytes, str]] = None
+
+    def install(self, keys: list[JwtKey]):
+        """ Make `keys[0]` the active key; other listed keys stay valid, unlisted ones are retired """
+        live = {kid for kid in self._keys if kid not in self._retire_at}
+        if self.active is not None and self.active.kid == keys[0].kid and live == {key.kid for key in keys}:
+            return  # Same key set, keep the cached JWKS
+        retire_at = time.time() + self.overlap_seconds
+        for kid in self._keys.keys() - {key.kid for key in keys}:
+            self._retire_at.setdefault(kid, retire_at)
+        for key in keys:
+            self._keys[key.kid] = key
+            self._retire_at.pop(key.kid, None)
+        self.active = keys[0]
+        self.prune()
+        self._jwks = None
+        logger.info("Signing with %s key %s (%d keys published)", self.algorithm, self.active.kid, len(self._keys))
+
+    def rotate(self, private_key=None):
+        """ Switch to a new (generated by default) key, retiring the current one after the overlap """
+        new_key = build_signing_key(self.purpose, self.algorithm, private_key or generate_private_key(self.algorithm))
+        self.install([new_key])
+
+    def prune(self):
+        now = time.time()
+        for kid in [kid for kid, retire_at in self._retire_at.items() if retire_at <= now]:
+            self._keys.pop(kid, None)
+            del self._retire_at[kid]
+            self._jwks = None
+
+    def encode(self, payload: dict) -> str:
+        return self.active.encode(payload)
+
+    def decode(self, token: str) -> dict:
+        key = self._keys.get(pyJwt.get_unverified_header(token).get("kid"))
+        if key is None or self._retire_at.get(key.kid, float("inf")) <= time.time():
+            raise pyJwt.InvalidTokenError("Unknown signing key")
+        return key.decode(token)
+
+    def jwks(self) -> tuple[bytes, str]:
+        """ Serialized JWKS and its ETag, rebuilt only when the key set changes """
+        self.prune()
+        if self._jwks is None:
+            body = json.dumps({"keys": [key.public_jwk() for key in self._keys.values()]}).encode()
+            self._jwks = body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return self._jwks
+
+
+def _access_key_ring() -> JwtKeyRing:
+    # Retired keys must outlive every token they signed
+    overlap_minutes = max(app_config.JWT_KEY_OVERLAP_MINUTES, app_config.ACCESS_TOKEN_EXPIRE_MINUTES)
+    ring = JwtKeyRing("access", app_config.JWT_ALGORITHM, overlap_minutes * 60)
+    reload_access_keys(ring)
+    return ring
+
+
+def reload_access_keys(ring: JwtKeyRing):
+    """
+    (Re)load keys from JWT_PRIVATE_KEY_FILES, active key first, or generate one if none are
+    configured; a generated key only suits a single process (`main.serve` refuses several workers)
+    """
+    paths = [path.strip() for path in app_config.JWT_PRIVATE_KEY_FILES.split(",") if path.strip()]
+    if not paths:
+        logger.warning("No JWT_PRIVATE_KEY_FILES configured, generating a process-local %s key", ring.algorithm)
+        ring.rotate()
+        return
+    ring.install([build_signing_key(ring.purpose, ring.algorithm, load_private_key(path)) for path in paths])
+
+
+class TokenKeys:
+    """ Holder for the access and refresh token keys, built once from config """
+    _instance = None  # Singleton instance
+
+    def __init__(self, access: JwtKey | JwtKeyRing, refresh: JwtKey):
+        self.access = access
+        self.refresh = refresh
+
+    @classmethod
+    def get_instance(cls) -> "TokenKeys":
+        if cls._instance is None:
+            if app_config.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+                access = _access_key_ring()
+            elif app_config.JWT_ALGORITHM == "HS256":
+                access_secret = b64decode(app_config.SECRET_KEY)
+                access = JwtKey("access", "HS256", access_secret, access_secret)
+            else:
+                raise GlobalException(f"Unsupported JWT_ALGORITHM '{app_config.JWT_ALGORITHM}'", 500)
+
+            # Refresh tokens are only ever verified by this service, so they stay symmetric
+            refresh_secret = app_config.REFRESH_SECRET_KEY.encode()
+            cls._instance = cls(access, JwtKey("refresh", "HS256", refresh_secret, refresh_secret))
+        return cls._instance
+
+    def jwks(self) -> tuple[bytes, str]:
+        if isinstance(self.access, JwtKeyRing):
+            return self.access.jwks()
+        return b'{"keys": []}', '"empty"'
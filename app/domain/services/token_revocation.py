@@ -0,0 +1,135 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import Iterable, Optional
+
+from app.adapters.out.database.repositories.revoked_token_repository import RevokedTokenRepository
+from app.config.config import app_config
+
+logger = getLogger(__name__)
+
+
+def _epoch(value: datetime) -> float:
+    """ Mongo returns naive UTC datetimes """
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenRevocationList:
+    """
+    Per-process mirror of the revoked access tokens stored in Mongo.
+
+    Holds `jti -> exp` for tokens that have not expired, so checking a request is a
+    dict lookup. Revocations made by this process apply at once; those from other
+    workers arrive by polling for sequence numbers above the last one applied.
+
+    A number is taken before its document is written, so it can show up late or
+    never (a crashed writer, a repeated revocation, an entry the TTL index already
+    removed). The watermark only moves over contiguous numbers: a hole is waited
+    for up to REVOCATION_GAP_GRACE_SECONDS, and everything above it is fetched
+    again on each poll meanwhile.
+    """
+    _instance = None  # Singleton instance
+    SYNC_BATCH = 10000  # Most revocations applied per poll
+
+    def __init__(self, repository: RevokedTokenRepository, grace_seconds: float):
+        self.repository = repository
+        self.grace_seconds = grace_seconds
+        self._revoked: dict[str, float] = {}  # jti -> token expiry (epoch seconds)
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._hole_since: Optional[float] = None
+        self.loaded = False
+        self.seq = 0  # Every revocation numbered up to here has been applied
+        self.syncs = 0
+        self.sync_failures = 0
+        self.skipped_numbers = 0
+
+    @classmethod
+    def get_instance(cls) -> "TokenRevocationList":
+        if cls._instance is None:
+            cls._instance = cls(RevokedTokenRepository(), app_config.REVOCATION_GAP_GRACE_SECONDS)
+        return cls._instance
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """ No I/O; tokens without a `jti` predate revocation support and cannot be revoked """
+        return jti is not None and jti in self._revoked
+
+    async def revoke(self, jti: str, user_id: str, expires_at: float):
+        """ Revoke a token here immediately, and for the other workers from their next poll """
+        self._revoked[jti] = expires_at
+        await self.repository.revoke(jti, user_id, datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None))
+
+    async def ensure_loaded(self):
+        """ Full load on first use; concurrent first callers share it """
+        if self.loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if not self.loaded:
+                await self.load()
+
+    async def load(self):
+        entries = await self.repository.find_active()
+        self._apply(entries)
+        # Entries older than the grace period cannot be preceded by a late write any more
+        settled = datetime.utcnow() - timedelta(seconds=self.grace_seconds)
+        self.seq = max((entry["seq"] for entry in entries if entry["revoked_at"] < settled), default=0)
+        self._advance(entry["seq"] for entry in entries)
+        self.loaded = True
+        logger.info("Loaded %d token revocations (sequence %d)", len(self._revoked), self.seq)
+
+    async def sync(self):
+        """ Apply revocations made elsewhere since the last poll and forget expired ones """
+        entries = await self.repository.find_since(self.seq, self.SYNC_BATCH)
+        self._apply(entries)
+        self._advance(entry["seq"] for entry in entries)
+        self._prune()
+        self.syncs += 1
+
+    async def run_sync(self, interval_seconds: float):
+        """ Background task polling for new revocations once the list is loaded """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            if not self.loaded:
+                continue  # Lazy startup: the first authenticated request loads it
+            try:
+                await self.sync()
+            except Exception:
+                self.sync_failures += 1
+                logger.exception("Token revocation sync failed")
+
+    def _apply(self, entries: list[dict]):
+        now = time.time()
+        for entry in entries:
+            expires_at = _epoch(entry["expires_at"])
+            if expires_at > now:
+                self._revoked[entry["_id"]] = expires_at
+
+    def _advance(self, seqs: Iterable[int]):
+        """ Move the watermark over contiguous numbers, skipping a hole once it is older than the grace period """
+        for seq in sorted(seq for seq in set(seqs) if seq > self.seq):
+            if seq != self.seq + 1:
+                now = time.monotonic()
+                if self._hole_since is None:
+                    self._hole_since = now
+                if now - self._hole_since < self.grace_seconds:
+                    return
+                self.skipped_numbers += seq - self.seq - 1
+            self.seq = seq
+            self._hole_since = None
+
+    def _prune(self):
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "sequence": self.seq,
+            "loaded": self.loaded,
+            "syncs": self.syncs,
+            "sync_failures": self.sync_failures,
+            "skipped_numbers": self.skipped_numbers,
+        }
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Optional
+
+from pydantic import BaseModel, ValidationError
+
+from app.adapters.out.database.entities.user import User, UserCreate
+from app.adapters.out.database.repositories.user_repository import UserRepository
+from app.adapters.out.files.user_file_reader import RowError, detect_format, iter_user_rows
+from app.adapters.out.security.password_executor import PasswordExecutor
+from app.config.config import app_config
+
+logger = getLogger(__name__)
+
+
+class UserImportFailure(BaseModel):
+    row: int  # 1-based position in the file, header excluded
+    email: Optional[str] = None
+    error: str
+
+
+class UserImportReport(BaseModel):
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    failures: list[UserImportFailure] = []
+    failures_truncated: bool = False
+    duration_seconds: float = 0.0
+
+
+class UserImportService:
+    """
+    Bulk user import from NDJSON, CSV or Parquet files.
+
+    The file is streamed chunk by chunk: each chunk is validated against UserCreate,
+    hashed on a dedicated pool spanning all cores and written with one unordered
+    insert_many. Bad rows and duplicate emails are reported without stopping the run,
+    so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, user_repo: UserRepository):
+        self.user_repo = user_repo
+
+    async def import_file(self, path: str, file_format: Optional[str] = None) -> UserImportReport:
+        file_format = detect_format(path, file_format)
+        report = UserImportReport()
+        started = time.perf_counter()
+
+        # Separate from the login pool so an import cannot starve /auth/token
+        executor = PasswordExecutor(app_config.USER_IMPORT_HASH_POOL, app_config.USER_IMPORT_WORKERS, 0)
+        executor.start()
+        try:
+            chunks = iter_user_rows(path, file_format, app_config.USER_IMPORT_BATCH_SIZE)
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                await self._import_chunk(chunk, report, executor)
+                logger.info("Imported %d/%d users so far", report.inserted, report.total)
+        finally:
+            await asyncio.to_thread(executor.shutdown)
+
+        report.duration_seconds = round(time.perf_counter() - started, 3)
+        logger.info("User import finished: %d inserted, %d failed", report.inserted, report.failed)
+        return report
+
+    async def _import_chunk(self, chunk: list[dict], report: UserImportReport, executor: PasswordExecutor):
+        first_row = report.total + 1
+        report.total += len(chunk)
+
+        valid: list[tuple[int, UserCreate]] = []
+        for offset, record in enumerate(chunk):
+            row = first_row + offset
+            if isinstance(record, RowError):
+                self._fail(report, row, None, record["error"])
+                continue
+            try:
+                valid.append((row, UserCreate.model_validate(record)))
+            except ValidationError as e:
+                message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                email = record.get("email")
+                self._fail(report, row, None if email is None else str(email), message)
+
+        if not valid:
+            return
+
+        hashed = await executor.hash_many([user.password for _, user in valid])
+        users = [
+            # Privileges are never taken from an import file
+            User(
+                **{key: value for key, value in user.create_update_dict().items() if key != "password"},
+                hashed_password=hashed_password,
+            )
+            for (_, user), hashed_password in zip(valid, hashed)
+        ]
+        errors = await self.user_repo.insert_users(users)
+
+        report.inserted += len(users) - len(errors)
+        for position, error in sorted(errors.items()):
+            row, user = valid[position]
+            self._fail(report, row, user.email, error)
+
+    @staticmethod
+    def _fail(report: UserImportReport, row: int, email: Optional[str], error: str):
+        report.failed += 1
+        if len(report.failures) < app_config.USER_IMPORT_MAX_REPORTED_FAILURES:
+            report.failures.append(UserImportFailure(row=row, email=email, error=error))
+        else:
+            report.failures_truncated = True
@@ -0,0 +1,275 @@
+"""
+In-process benchmark of the auth endpoints.
+
+Drives `main.create_app()` through httpx's ASGI transport against an in-memory
+motor-compatible database (mongomock-motor), so no server, Mongo or load tool is
+needed. Every bcrypt cost runs in a fresh interpreter because the cost is read
+from config at import time.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.auth_benchmark --rounds 4 10 --concurrency 1 16 64 --output benchmarks/results/latest.json
+    python -m benchmarks.auth_benchmark --compare benchmarks/results/baseline.json --threshold 0.2
+
+Numbers measure the application (routing, validation, JWT, bcrypt, caches, ODM),
+not the network or a real database.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PASSWORD = "benchmark-password"
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """ Nearest-rank percentile """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def _summary(latencies: list[float], statuses: dict[int, int], wall_seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def _drive(concurrency: int, total: int, send) -> dict:
+    """ Run `total` calls of `send(i)` with `concurrency` workers, timing each one """
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            status_code = await send(i)
+            latencies.append(time.perf_counter() - start)
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summary(latencies, statuses, time.perf_counter() - start)
+
+
+async def _run_cost(rounds: int, concurrency_levels: list[int], requests: int, warmup: int) -> dict:
+    """ Every scenario at every concurrency level for the bcrypt cost this process was started with """
+    import httpx
+    from fastapi import Depends
+    from mongomock_motor import AsyncMongoMockClient
+
+    from app.adapters.out.database.db import OutDatabase
+    from app.application.dependencies.auth_dependencies import get_current_user
+    from benchmarks import mongomock_compat
+    from main import create_app
+
+    mongomock_compat.install()
+    OutDatabase.set_client_factory(AsyncMongoMockClient)
+    app = create_app()
+
+    @app.get("/_benchmark/me", include_in_schema=False)
+    async def me(user=Depends(get_current_user)):
+        return {"id": str(user.id)}
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            # Login/refresh/authenticated scenarios reuse one registered account per concurrent client
+            accounts = max(concurrency_levels)
+            for i in range(accounts):
+                response = await client.post("/auth/register", json={
+                    "email": f"seed{i}@example.com", "password": PASSWORD, "name": f"Seed {i}",
+                })
+                response.raise_for_status()
+            sessions = []
+            for i in range(accounts):
+                response = await client.post(
+                    "/auth/token", data={"username": f"seed{i}@example.com", "password": PASSWORD}
+                )
+                response.raise_for_status()
+                sessions.append(response.json())
+
+            registered = 0
+
+            async def register(i: int) -> int:
+                nonlocal registered
+                registered += 1
+                response = await client.post("/auth/register", json={
+                    "email": f"user{registered}@example.com", "password": PASSWORD, "name": "Benchmark",
+                })
+                return response.status_code
+
+            async def token(i: int) -> int:
+                response = await client.post(
+                    "/auth/token", data={"username": f"seed{i % accounts}@example.com", "password": PASSWORD}
+                )
+                return response.status_code
+
+            idle_sessions = list(sessions)
+
+            async def refresh(i: int) -> int:
+                # Rotation makes refresh tokens single-use: a session is only ever held by one worker
+                session = idle_sessions.pop()
+                try:
+                    response = await client.post("/auth/refresh", params={"refresh_token": session["refresh_token"]})
+                    if response.status_code == 200:
+                        session["refresh_token"] = response.json()["refresh_token"]
+                    return response.status_code
+                finally:
+                    idle_sessions.append(session)
+
+            async def authenticated(i: int) -> int:
+                access_token = sessions[i % accounts]["access_token"]
+                response = await client.get("/_benchmark/me", headers={"Authorization": f"Bearer {access_token}"})
+                return response.status_code
+
+            scenarios = {"register": register, "token": token, "refresh": refresh, "authenticated": authenticated}
+            for name, send in scenarios.items():
+                for concurrency in concurrency_levels:
+                    if warmup:
+                        await _drive(concurrency, warmup, send)
+                    results[f"{name}|c={concurrency}|rounds={rounds}"] = {
+                        "scenario": name,
+                        "concurrency": concurrency,
+                        "bcrypt_rounds": rounds,
+                        **await _drive(concurrency, requests, send),
+                    }
+    return results
+
+
+def _benchmark_env(rounds: int, audit_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "MONGO_URI": "mongodb://benchmark",
+        "DATABASE_NAME": "benchmark",
+        "APP_ENV": "benchmark",
+        "DEBUG": "false",
+        "LOG_LEVEL": env.get("LOG_LEVEL", "ERROR"),
+        "PASSWORD_HASH_ALGORITHM": "bcrypt",
+        "BCRYPT_ROUNDS": str(rounds),
+        "PASSWORD_HASH_TARGET_MS": "0",
+        "REFRESH_TOKEN_STORE": "memory",
+        "AUDIT_LOG_DIR": audit_dir,  # Audit events are written as in production, then thrown away
+    })
+    env.setdefault("SECRET_KEY", base64.b64encode(secrets.token_bytes(32)).decode())
+    env.setdefault("REFRESH_SECRET_KEY", secrets.token_urlsafe(32))
+    env.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+    return env
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rounds_list: list[int], concurrency_levels: list[int], requests: int, warmup: int) -> dict:
+    results = {}
+    for rounds in rounds_list:
+        print(f"bcrypt rounds {rounds}...", file=sys.stderr)
+        command = [
+            sys.executable, "-m", "benchmarks.auth_benchmark", "--worker", "--rounds", str(rounds),
+            "--concurrency", *map(str, concurrency_levels), "--requests", str(requests), "--warmup", str(warmup),
+        ]
+        with tempfile.TemporaryDirectory(prefix="audit-") as audit_dir:
+            completed = subprocess.run(command, env=_benchmark_env(rounds, audit_dir), capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            raise SystemExit(f"Benchmark run for bcrypt rounds {rounds} failed")
+        results.update(json.loads(completed.stdout.splitlines()[-1]))
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": requests,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """ Cases whose p95 latency rose, or throughput fell, by more than `threshold` """
+    regressions = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        if before["p95_ms"] and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{key}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if before["requests_per_second"] and \
+                result["requests_per_second"] < before["requests_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{key}: {before['requests_per_second']} req/s -> {result['requests_per_second']} req/s"
+            )
+    return regressions
+
+
+def print_table(report: dict):
+    header = f"{'scenario':<14}{'conc':>6}{'rounds':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses"
+    print(header)
+    print("-" * len(header))
+    for result in report["results"].values():
+        print(f"{result['scenario']:<14}{result['concurrency']:>6}{result['bcrypt_rounds']:>8}"
+              f"{result['requests_per_second']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['p99_ms']:>10}  {result['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the auth endpoints in-process")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[4, 12], help="bcrypt costs to run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each measurement")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here, e.g. to keep as a baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown (0.2 = 20%%)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        results = asyncio.run(_run_cost(args.rounds[0], args.concurrency, args.requests, args.warmup))
+        print(json.dumps(results))
+        return
+
+    report = run(args.rounds, args.concurrency, args.requests, args.warmup)
+    print_table(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}")
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regression beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
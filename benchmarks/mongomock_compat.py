@@ -0,0 +1,20 @@
+"""
+Where mongomock, the in-memory stand-in used by the benchmarks and tests, differs
+from MongoDB in ways the app's updates run into.
+
+MongoDB compares values of different types in BSON type order, so `$max` replaces a
+null field with any date (a user's first login). mongomock compares with Python's
+`max` and raises TypeError.
+"""
+import mongomock.collection
+
+
+def _max_updater(doc, field_name, value):
+    if isinstance(doc, dict):
+        current = doc.get(field_name)
+        doc[field_name] = value if current is None else max(current, value)
+
+
+def install():
+    """ Patch mongomock for this process """
+    mongomock.collection._updaters["$max"] = _max_updater
@@ -1,15 +1,95 @@
-import uvicorn
-from fastapi import FastAPI
-from app.config.config import app_config
-from app.app_module import app_module
+from app.config.metrics.startup import startup_timer  # First import: starts the startup clock
+
+import argparse
+import importlib.util
+import os
+from logging import getLogger
+
+with startup_timer.measure("config"):
+    from app.config.config import app_config
+with startup_timer.measure("import"):
+    from fastapi import FastAPI
+    from app.app_module import app_module
+    from app.config.exception.global_exception import GlobalException
+    from app.config.logging.logging_config import setup_logging
+    from app.config.server.responses import DefaultJSONResponse
+    from app.config.server.runtime import server_workers
+
+logger = getLogger(__name__)
 
 def create_app() -> FastAPI:
     """ Create FastAPI app and register modules """
-    app = FastAPI(debug=app_config.DEBUG)
-    app_module(app)  # Register all application components
+    with startup_timer.measure("create_app"):
+        startup_timer.budget_seconds = app_config.STARTUP_BUDGET_SECONDS
+        app = FastAPI(debug=app_config.DEBUG, default_response_class=DefaultJSONResponse)
+        app_module(app)  # Register all application components
     return app
 
-app = create_app()  # Initialize application
+def __getattr__(name: str):
+    """ Build `main:app` on first access, so importing this module (launcher, workers) creates no app """
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _implementation(setting: str, value: str, preferred: str, fallback: str) -> str:
+    """ Resolve 'auto' to the fast implementation when installed, and fail early on a missing one """
+    installed = importlib.util.find_spec(preferred) is not None
+    if value == "auto":
+        return preferred if installed else fallback
+    if value == preferred and not installed:
+        raise GlobalException(f"{setting}={value} but the '{preferred}' package is not installed", 500)
+    return value
+
+def serve():
+    """
+    Production server: pre-forked uvicorn workers, each building its own app.
+
+    Workers import `create_app` and run the lifespan themselves, so every process
+    gets its own Motor client, Beanie init and hashing pool; nothing created in
+    this parent process is shared with them.
+    """
+    import uvicorn
+    from app.domain.services.token_keys import ASYMMETRIC_ALGORITHMS
+
+    workers = server_workers()
+    if workers > 1 and app_config.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS and not app_config.JWT_PRIVATE_KEY_FILES:
+        # Each worker would generate its own key: tokens from one fail on the others, and JWKS depends on the worker
+        raise GlobalException(
+            f"JWT_ALGORITHM={app_config.JWT_ALGORITHM} with {workers} workers needs JWT_PRIVATE_KEY_FILES "
+            "(a generated key is only for a single process)", 500
+        )
+
+    setup_logging()  # For the supervisor process; workers configure their own in create_app
+    os.environ["SERVER_WORKERS"] = str(workers)  # Workers size their hashing pools from it
+
+    if workers > 1:
+        if app_config.REFRESH_TOKEN_STORE == "memory" or app_config.LOGIN_THROTTLE_BACKEND == "memory":
+            logger.warning("In-memory refresh token store / login throttle counters are per worker")
+
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host=app_config.SERVER_HOST,
+        port=app_config.SERVER_PORT,
+        workers=workers,
+        loop=_implementation("SERVER_LOOP", app_config.SERVER_LOOP, "uvloop", "asyncio"),
+        http=_implementation("SERVER_HTTP", app_config.SERVER_HTTP, "httptools", "h11"),
+        backlog=app_config.SERVER_BACKLOG,
+        timeout_keep_alive=app_config.SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=app_config.SERVER_GRACEFUL_TIMEOUT,
+        forwarded_allow_ips=app_config.SERVER_FORWARDED_ALLOW_IPS,
+        log_config=None,  # Logging is configured by the app (setup_logging)
+        access_log=False,  # Requests are logged, sampled, by RequestMiddleware
+    )
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=3010, reload=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the API server")
+    parser.add_argument("mode", nargs="?", choices=["dev", "serve"], default="dev",
+                        help="'dev': single auto-reloading process, 'serve': production workers")
+    if parser.parse_args().mode == "serve":
+        serve()
+    else:
+        import uvicorn
+
+        uvicorn.run("main:create_app", factory=True, host="127.0.0.1", port=app_config.SERVER_PORT, reload=True)
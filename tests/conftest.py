@@ -0,0 +1,57 @@
+"""
+Test settings: an in-memory `mongomock-motor` database (pip install -r benchmarks/requirements.txt)
+and throwaway secrets, set before the app reads its config.
+"""
+import base64
+import os
+import secrets
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # `pytest tests/` without installing the app
+
+os.environ.update({
+    "MONGO_URI": "mongodb://tests",
+    "DATABASE_NAME": "tests",
+    "APP_ENV": "test",
+    "DEBUG": "false",
+    "BCRYPT_ROUNDS": "4",
+    "PASSWORD_HASH_ALGORITHM": "bcrypt",
+    "PASSWORD_HASH_TARGET_MS": "0",
+    "REFRESH_TOKEN_STORE": "memory",
+    "AUDIT_LOG_DIR": tempfile.mkdtemp(prefix="audit-"),
+    "SECRET_KEY": base64.b64encode(secrets.token_bytes(32)).decode(),
+    "REFRESH_SECRET_KEY": secrets.token_urlsafe(32),
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "15",
+})
+
+from app.adapters.out.database.db import OutDatabase  # noqa: E402 (reads the settings above)
+from benchmarks import mongomock_compat  # noqa: E402
+from main import create_app  # noqa: E402
+
+mongomock_compat.install()
+
+
+@pytest.fixture
+def app_client():
+    """
+    Start the app on a fresh in-memory database: `async with app_client() as client:`
+    gives an HTTP client for it, with the lifespan (pools, background tasks) running
+    """
+    @asynccontextmanager
+    async def start(client_factory=AsyncMongoMockClient) -> AsyncIterator[httpx.AsyncClient]:
+        OutDatabase.set_client_factory(client_factory)
+        app = create_app()
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client
+
+    return start
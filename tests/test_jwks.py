@@ -0,0 +1,19 @@
+import asyncio
+
+from app.config.config import app_config
+
+
+def _unreachable_mongo(*args, **kwargs):
+    raise ConnectionError("Mongo is down")
+
+
+def test_jwks_is_served_without_the_database(app_client, monkeypatch):
+    monkeypatch.setattr(app_config, "STARTUP_MODE", "lazy")
+
+    async def fetch_jwks() -> tuple[int, int]:
+        async with app_client(_unreachable_mongo) as client:
+            response = await client.get("/.well-known/jwks.json")
+            cached = await client.get("/.well-known/jwks.json", headers={"If-None-Match": response.headers["ETag"]})
+        return response.status_code, cached.status_code
+
+    assert asyncio.run(fetch_jwks()) == (200, 304)
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from beanie import PydanticObjectId
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from app.adapters.out.database.entities.user import User
+from app.adapters.out.database.login_bookkeeping import LoginBookkeeping, _PendingUpdate
+from app.config.config import app_config
+
+PASSWORD = "password123"
+
+
+def test_first_login_timestamps_are_written(app_client, monkeypatch):
+    monkeypatch.setattr(app_config, "LOGIN_THROTTLE_ENABLED", False)
+    bookkeeping = LoginBookkeeping.get_instance()
+
+    async def first_logins() -> tuple[User, dict, dict]:
+        async with app_client() as client:
+            before = bookkeeping.stats()
+            email = "first-login@example.com"
+            await client.post("/auth/register", json={"email": email, "password": PASSWORD, "name": "First"})
+            for password in ("wrong", PASSWORD):
+                await client.post("/auth/token", data={"username": email, "password": password})
+            await bookkeeping.flush()
+            user = await User.find_one(User.email == email)
+            after = bookkeeping.stats()
+        return user, before, after
+
+    user, before, after = asyncio.run(first_logins())
+
+    assert user.last_login is not None  # Stored as null until then
+    assert user.last_failed_login is not None
+    assert after["pending_users"] == 0
+    assert after["failed_flushes"] == before["failed_flushes"]
+
+
+def test_one_update_per_user():
+    update = _PendingUpdate(failures=2, last_login=datetime(2026, 1, 2), last_failed_login=datetime(2026, 1, 1))
+
+    operation = update.operation(PydanticObjectId())
+
+    assert operation._doc == {
+        "$inc": {"failed_log_attempts": 2},
+        "$max": {"last_login": datetime(2026, 1, 2), "last_failed_login": datetime(2026, 1, 1)},
+    }
+
+
+class _FailingCollection:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def bulk_write(self, operations, ordered):
+        raise self.error
+
+
+@pytest.mark.parametrize("error, pending", [
+    (AutoReconnect("primary stepped down"), 1),
+    (OperationFailure("document failed validation", code=121), 0),
+])
+def test_only_transient_failures_are_retried(monkeypatch, error, pending):
+    monkeypatch.setattr(User, "get_motor_collection", classmethod(lambda cls: _FailingCollection(error)))
+    bookkeeping = LoginBookkeeping(flush_seconds=1, max_pending=10)
+
+    async def fail_once():
+        await bookkeeping.record_failure(PydanticObjectId())
+        await bookkeeping.flush()
+
+    asyncio.run(fail_once())
+
+    assert bookkeeping.stats()["pending_users"] == pending
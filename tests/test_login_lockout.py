@@ -0,0 +1,36 @@
+import asyncio
+
+from app.adapters.out.database.entities.user import User
+from app.config.config import app_config
+
+PASSWORD = "password123"
+LOCK_MINUTES = 0.01
+
+
+def test_expired_lock_needs_a_full_threshold_again(app_client, monkeypatch):
+    monkeypatch.setattr(app_config, "LOGIN_THROTTLE_ENABLED", False)
+    monkeypatch.setattr(app_config, "LOGIN_LOCKOUT_THRESHOLD", 3)
+    monkeypatch.setattr(app_config, "LOGIN_LOCKOUT_MINUTES", LOCK_MINUTES)
+
+    async def lock_then_fail_once() -> tuple[list[int], int, int, User]:
+        async with app_client() as client:
+            email = "lockout@example.com"
+            await client.post("/auth/register", json={"email": email, "password": PASSWORD, "name": "Lockout"})
+
+            async def login(password: str) -> int:
+                response = await client.post("/auth/token", data={"username": email, "password": password})
+                return response.status_code
+
+            until_locked = [await login("wrong") for _ in range(app_config.LOGIN_LOCKOUT_THRESHOLD + 1)]
+            await asyncio.sleep(LOCK_MINUTES * 60 + 0.2)
+            after_expiry = await login("wrong")
+            correct = await login(PASSWORD)
+            user = await User.find_one(User.email == email)
+        return until_locked, after_expiry, correct, user
+
+    until_locked, after_expiry, correct, user = asyncio.run(lock_then_fail_once())
+
+    assert until_locked == [401, 401, 401, 429]
+    assert after_expiry == 401  # Not locked again by a single failure
+    assert correct == 200
+    assert user.failed_log_attempts == 0
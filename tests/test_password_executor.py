@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from app.adapters.out.database.entities.user import User
+from app.adapters.out.database.entities.user_projections import UserCredentials
+from app.adapters.out.database.repositories.user_repository import UserRepository
+from app.adapters.out.security.password_executor import PasswordExecutor, PoolSaturated
+from app.domain.services.auth_service import AuthService, password_rehash_total
+
+
+async def _while_pool_is_busy(executor: PasswordExecutor, operation):
+    """ Run `operation` while the executor's only worker is taken """
+    busy = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+    await asyncio.sleep(0)  # Let it take the worker
+    try:
+        return await operation()
+    finally:
+        await busy
+
+
+def test_full_pool_sheds_with_retry_after():
+    executor = PasswordExecutor("thread", max_workers=1, max_queue=0)
+    executor.verify_seconds = 2.5
+
+    with pytest.raises(PoolSaturated) as rejected:
+        asyncio.run(_while_pool_is_busy(executor, lambda: executor.run(time.sleep, 0)))
+    executor.shutdown()
+
+    assert rejected.value.retry_after == 3
+    assert executor.stats()["rejected"] == 1
+
+
+def test_rehash_is_skipped_when_the_pool_is_full(app_client, monkeypatch):
+    executor = PasswordExecutor("thread", max_workers=1, max_queue=0)
+    monkeypatch.setattr(PasswordExecutor, "_instance", executor)
+
+    async def upgrade_on_a_full_pool():
+        async with app_client():
+            user = User(email="rehash@example.com", name="Rehash", hashed_password="$2b$04$old")
+            await user.insert()
+            credentials = UserCredentials.model_validate(user.model_dump(by_alias=True))
+            service = AuthService(UserRepository())
+            await _while_pool_is_busy(executor, lambda: service._upgrade_password_hash(credentials, "password123"))
+
+    def outcomes() -> dict:
+        return {result: password_rehash_total._values.get((result,), 0) for result in ("skipped", "error")}
+
+    before = outcomes()
+    asyncio.run(upgrade_on_a_full_pool())
+    after = outcomes()
+
+    assert after["skipped"] == before["skipped"] + 1
+    assert after["error"] == before["error"]
+
+
+def test_full_pool_answers_503_with_retry_after(app_client, monkeypatch):
+    executor = PasswordExecutor("thread", max_workers=1, max_queue=0)
+    monkeypatch.setattr(PasswordExecutor, "_instance", executor)
+
+    async def register_on_a_full_pool():
+        async with app_client() as client:
+            return await _while_pool_is_busy(executor, lambda: client.post(
+                "/auth/register", json={"email": "busy@example.com", "password": "password123", "name": "Busy"}
+            ))
+
+    response = asyncio.run(register_on_a_full_pool())
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,45 @@
+import asyncio
+
+from app.adapters.out.cache.principal_cache import PrincipalCache
+
+
+def test_cancelled_owner_does_not_cancel_waiters():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    loads = []
+
+    async def loader(user_id: str):
+        loads.append(user_id)
+        await asyncio.sleep(0.05)
+        return {"id": user_id}
+
+    async def cancel_the_first_lookup():
+        owner = asyncio.create_task(cache.get_or_load("u1", loader))
+        await asyncio.sleep(0)  # The owner starts the load
+        waiter = asyncio.create_task(cache.get_or_load("u1", loader))
+        await asyncio.sleep(0)  # The waiter joins it
+        owner.cancel()
+        return await waiter, owner.cancelled()
+
+    principal, owner_cancelled = asyncio.run(cancel_the_first_lookup())
+
+    assert owner_cancelled
+    assert principal == {"id": "u1"}
+    assert loads == ["u1", "u1"]  # The waiter loaded it again itself
+
+
+def test_cancelled_batch_owner_does_not_cancel_waiters():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+
+    async def loader(user_ids: list[str]):
+        await asyncio.sleep(0.05)
+        return {user_id: {"id": user_id} for user_id in user_ids}
+
+    async def cancel_the_first_batch():
+        owner = asyncio.create_task(cache.get_many_or_load(["u1", "u2"], loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_many_or_load(["u2"], loader))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(cancel_the_first_batch()) == {"u2": {"id": "u2"}}
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.adapters.out.database.entities.user import User
+from app.adapters.out.database.registered_email_filter import RegisteredEmailFilter
+from app.adapters.out.security.password_executor import PasswordExecutor
+
+PASSWORD = "password123"
+
+
+def _no_database(*args, **kwargs):
+    raise AssertionError("the users collection was queried")
+
+
+def test_unknown_email_is_answered_without_the_database(app_client, monkeypatch):
+    async def login_unknown_and_unsynced() -> tuple[int, int, int]:
+        async with app_client() as client:
+            registered_emails = RegisteredEmailFilter.get_instance()
+            await registered_emails.rebuild()
+            # Inserted behind this process's back, as another worker would, before the next sync
+            await User(
+                email="elsewhere@example.com", name="Elsewhere",
+                hashed_password=await PasswordExecutor.get_instance().hash(PASSWORD),
+            ).insert()
+
+            async def login(email: str) -> int:
+                response = await client.post("/auth/token", data={"username": email, "password": PASSWORD})
+                return response.status_code
+
+            with pytest.MonkeyPatch.context() as offline:
+                offline.setattr(User, "find_one", _no_database)
+                offline.setattr(User, "get_motor_collection", _no_database)
+                unknown, unsynced = await login("nobody@example.com"), await login("elsewhere@example.com")
+            await registered_emails.sync()
+            synced = await login("elsewhere@example.com")
+        return unknown, unsynced, synced
+
+    unknown, unsynced, synced = asyncio.run(login_unknown_and_unsynced())
+
+    assert unknown == 401
+    assert unsynced == 401  # Lag window: known here from the next sync on
+    assert synced == 200
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.adapters.out.database.entities.user import User
+
+PASSWORD = "password123"
+
+
+def test_registration_cannot_grant_superuser(app_client):
+    async def register_and_call_staff_routes() -> tuple[User, int, int]:
+        async with app_client() as client:
+            response = await client.post("/auth/register", json={
+                "email": "mallory@example.com", "password": PASSWORD, "name": "Mallory",
+                "is_superuser": True, "is_active": True, "is_verified": True,
+            })
+            response.raise_for_status()
+            response = await client.post("/auth/token", data={"username": "mallory@example.com", "password": PASSWORD})
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            imported = await client.post(
+                "/admin/users/import", headers=headers,
+                files={"file": ("users.ndjson", b'{"email": "x@example.com", "password": "pw", "name": "x"}\n')},
+            )
+            introspected = await client.post("/auth/introspect", headers=headers, json={"tokens": ["token"]})
+            user = await User.find_one(User.email == "mallory@example.com")
+        return user, imported.status_code, introspected.status_code
+
+    user, import_status, introspect_status = asyncio.run(register_and_call_staff_routes())
+
+    assert user.is_superuser is False
+    assert user.is_verified is False
+    assert import_status == 403
+    assert introspect_status == 403
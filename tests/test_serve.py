@@ -0,0 +1,21 @@
+import pytest
+import uvicorn
+
+import main
+from app.config.config import app_config
+from app.config.exception.global_exception import GlobalException
+
+
+def _started(*args, **kwargs):
+    raise AssertionError("the server was started")
+
+
+@pytest.mark.parametrize("algorithm", ["EdDSA", "ES256"])
+def test_workers_need_shared_signing_keys(monkeypatch, algorithm):
+    monkeypatch.setattr(uvicorn, "run", _started)
+    monkeypatch.setattr(app_config, "JWT_ALGORITHM", algorithm)
+    monkeypatch.setattr(app_config, "JWT_PRIVATE_KEY_FILES", "")
+    monkeypatch.setattr(app_config, "SERVER_WORKERS", 2)
+
+    with pytest.raises(GlobalException, match="JWT_PRIVATE_KEY_FILES"):
+        main.serve()
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.adapters.out.cache.principal_cache import PrincipalCache
+from app.adapters.out.database.entities.user import User
+from app.application.dependencies.admission_dependencies import AdmissionController
+from app.config.config import app_config
+
+PASSWORD = "password123"
+
+
+def test_introspection_is_for_staff_and_superusers(app_client):
+    async def introspect_as(flags: dict) -> int:
+        async with app_client() as client:
+            email = f"gateway-{'-'.join(flags) or 'user'}@example.com"
+            response = await client.post("/auth/register", json={"email": email, "password": PASSWORD, "name": "Gateway"})
+            response.raise_for_status()
+            await User.get_motor_collection().update_one({"email": email}, {"$set": flags})
+            PrincipalCache.get_instance().invalidate(response.json()["user_id"])
+            response = await client.post("/auth/token", data={"username": email, "password": PASSWORD})
+            token = response.json()["access_token"]
+            response = await client.post(
+                "/auth/introspect", headers={"Authorization": f"Bearer {token}"}, json={"tokens": [token]}
+            )
+        return response.status_code
+
+    assert asyncio.run(introspect_as({"is_staff": True})) == 200
+    assert asyncio.run(introspect_as({"is_superuser": True})) == 200
+    assert asyncio.run(introspect_as({})) == 403
+
+
+def test_introspection_has_its_own_budget():
+    default = AdmissionController(app_config.ADMISSION_BUDGETS).limiter("default").budget
+    assert AdmissionController(app_config.ADMISSION_BUDGETS).limiter("introspection").budget is not default